@@ -6,11 +6,13 @@ from PyQt5.QtCore import Qt
 
 from .graphics_effects import qss, shadows
 from systems.horizontal_system import horizontal_functions as hf
+from systems.sample_system import sample_functions as sf
 from systems.vertical_system import available_scales, vertical_functions as vf
-from .actions.display import update_timebase_label, update_delay_label
+from .actions.display import toggle_persistence, update_timebase_label, update_delay_label
 from .actions.connectors import use_plug
 
-from front_panel.custom_widgets.chart import MplCanvas
+from front_panel.custom_widgets.surface import get_surface_class
+from settings import DEFAULT_DISPLAY_BACKEND
 
 
 def initialize_gui(self):
@@ -172,7 +174,8 @@ def update_labels_on_display(self):
 
 
 def add_chart_to_layout(self):
-    self.canvas = MplCanvas(
+    surface_class = get_surface_class(getattr(self, "display_backend", DEFAULT_DISPLAY_BACKEND))
+    self.canvas = surface_class(
         parent=self,
         delay_position=float(self.delay),
         xlim=hf.calculate_chart_xlimit(self, self.timebase, self.delay),
@@ -232,13 +235,18 @@ def activate_channel_switches(self):
         )
 
 
-def activate_front_panel(self):
-    # SIGNAL GENERATION
-    self.channel1_thread = None
-    self.channel1_generator = None
-    self.channel2_thread = None
-    self.channel2_generator = None
+def activate_run_control(self):
+    # Checked (green) is running, unchecked (red) is stopped: the horizontal knobs then zoom
+    # and pan over the held frames. The button shows the current state before it is connected.
+    self.runStop_button.setChecked(not self.signalmanager.compositor.holding)
+    self.runStop_button.toggled.connect(lambda checked, self=self: sf.run_control(self, stopped=not checked))
+
+
+def activate_display_controls(self):
+    self.displayPersist_button.toggled.connect(lambda state, self=self: toggle_persistence(self, state))
+
 
+def activate_front_panel(self):
     set_dials_from_settings(self)
     update_labels_on_display(self)
     add_chart_to_layout(self)
@@ -247,6 +255,8 @@ def activate_front_panel(self):
     activate_connectors(self)
 
     activate_channel_switches(self)
+    activate_run_control(self)
+    activate_display_controls(self)
 
 
 def deactivate_front_panel(self):
@@ -265,3 +275,13 @@ def deactivate_front_panel(self):
         self.timebase_selected.disconnect()
     except Exception:
         pass
+
+    try:
+        self.runStop_button.toggled.disconnect()
+    except Exception:
+        pass
+
+    try:
+        self.displayPersist_button.toggled.disconnect()
+    except Exception:
+        pass
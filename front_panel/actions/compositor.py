@@ -0,0 +1,186 @@
+"""Coalesced redraw of the plotted signals.
+
+The generators deposit their frames into a per-channel mailbox that keeps
+only the latest one. A single GUI timer, ticking at the refresh rate of the
+screen, takes whatever is newest for every channel and issues exactly one
+redraw of the canvas. Frames replaced before a tick are discarded (and
+counted), so the canvas is never redrawn more often than the screen can
+show it.
+
+While the acquisition is stopped the compositor holds the last frames and
+redraws the window of the horizontal knobs from their min/max pyramids
+(zoom and pan over the stored data). A pyramid is built on the first zoom
+or pan of its channel, so stopping does not pay for it on the GUI thread. With the persistence display on, a
+tick that follows new acquisitions also shows the accumulated hit-count
+image under the traces; the accumulator follows the geometry of the plot
+through the `geometry_changed` signal of the canvas."""
+
+import logging
+
+from PyQt5.QtCore import QObject, QTimer
+from PyQt5.QtGui import QGuiApplication
+
+from front_panel.actions.display import plot_columns, set_plotted_signal
+from front_panel.actions.pyramid import MinMaxPyramid
+
+DEFAULT_REFRESH_RATE = 60  # Hz, when the screen does not tell
+
+
+def _screen_refresh_rate() -> float:
+    screen = QGuiApplication.primaryScreen()
+    rate = screen.refreshRate() if screen is not None else 0
+    return rate if rate > 0 else DEFAULT_REFRESH_RATE
+
+
+class DisplayCompositor(QObject):
+    """Per-channel latest-frame mailboxes drawn on one timer tick.
+
+    A mailbox holds either a (t, wfm) pair or a frame source with a `read()`
+    method returning the latest unread frame (e.g. a `TripleBuffer`), which is
+    then only read on the tick. A batched frame carries the rows of several
+    channels, each of them is plotted on its own channel."""
+
+    def __init__(self, parent, refresh_rate: float | None = None):
+        super().__init__()
+        self.parent = parent
+        self._mailboxes: dict[int, tuple | object] = {}
+        self._shown: dict[int, tuple] = {}  # last plotted (t, wfm) of every channel
+        # While the acquisition is stopped: held (t, wfm) frames, replaced by their pyramids when drawn
+        self._held: dict[int, tuple | MinMaxPyramid] | None = None
+        self.persistence = None  # PersistenceAccumulator of the persistence display (see set_persistence)
+        self._persistence_canvas = None  # canvas whose geometry the accumulator follows
+        self._rendered_acquisitions: int | None = None  # acquisitions in the shown layer (None: stale)
+
+        self.timer = QTimer()
+        self.timer.setInterval(int(round(1000 / (refresh_rate or _screen_refresh_rate()))))
+        self.timer.timeout.connect(self.compose)
+
+        # COUNTERS
+        self.deposited = 0
+        self.drawn = 0
+        self.discarded = 0  # replaced in the mailbox before being drawn
+        self.redraws = 0
+
+    def deposit(self, channel: int, t, wfm):
+        """Leave the frame of the channel for the next tick (replacing an undrawn one)."""
+        if self._held is not None:
+            return  # a frame finished just before the stop
+        if isinstance(self._mailboxes.get(channel), tuple):
+            self.discarded += 1
+        self._mailboxes[channel] = (t, wfm)
+        self.deposited += 1
+        self._wake()
+
+    def deposit_source(self, channel: int, source):
+        """Let the next tick read the latest frame of `source` (its own stale frames are
+        dropped by the source itself)."""
+        if self._held is not None:
+            return  # a frame finished just before the stop
+        if isinstance(self._mailboxes.get(channel), tuple):
+            self.discarded += 1
+        self._mailboxes[channel] = source
+        self.deposited += 1
+        self._wake()
+
+    def _wake(self):
+        if not self.timer.isActive():
+            self.timer.start()
+
+    def compose(self):
+        """Draw the newest frame of every channel with a single redraw."""
+        mailboxes, self._mailboxes = self._mailboxes, {}
+        updated = False
+        for channel, item in mailboxes.items():
+            if isinstance(item, tuple):
+                t, wfm = item
+            else:
+                frame = item.read()  # type: ignore
+                if frame is None:
+                    continue
+                if frame.channels is not None:
+                    for row_channel, row in zip(frame.channels, frame.wfm):
+                        set_plotted_signal(self.parent, row_channel, frame.t, row)
+                        self._shown[row_channel] = (frame.t, row)
+                    self.drawn += 1
+                    updated = True
+                    continue
+                t, wfm = frame.t, frame.wfm
+            set_plotted_signal(self.parent, channel, t, wfm)
+            self._shown[channel] = (t, wfm)
+            self.drawn += 1
+            updated = True
+
+        if updated and self.persistence is not None:
+            self._show_persistence()
+        if updated:
+            self.parent.canvas.update_lines()
+            self.redraws += 1
+        else:
+            self.timer.stop()  # nothing arrives, sleep until the next deposit
+
+    def set_persistence(self, accumulator):
+        """Show the layer of `accumulator` under the traces (None: no persistence display)."""
+        self.persistence = accumulator
+        self._persistence_canvas = None  # configured on the next tick
+        self._rendered_acquisitions = None
+
+    def configure_persistence(self):
+        """Put the accumulator on the geometry of the plot (the hits of the next acquisitions
+        land on the current pixels). Connected to `geometry_changed` of the canvas."""
+        canvas = self.parent.canvas
+        if self.persistence is None or canvas is not self._persistence_canvas:
+            return
+        if self.persistence.configure(
+            canvas.plot_width(), canvas.plot_height(), canvas.xlim, {1: canvas.ylim1, 2: canvas.ylim2}
+        ):
+            self._rendered_acquisitions = None  # the images were cleared
+
+    def _show_persistence(self):
+        """Put the persistence layer under the traces, rendered again only when acquisitions
+        were accumulated (or the geometry changed) since the last one."""
+        canvas = self.parent.canvas
+        if canvas is not self._persistence_canvas:  # first tick, or the canvas was recreated
+            self._persistence_canvas = canvas
+            canvas.geometry_changed.connect(self.configure_persistence)
+            self.configure_persistence()
+        acquisitions = self.persistence.acquisitions  # type: ignore
+        if acquisitions == self._rendered_acquisitions:
+            return
+        self._rendered_acquisitions = acquisitions
+        canvas.set_persistence_image(self.persistence.render())  # type: ignore
+
+    def hold(self):
+        """Keep the last frames for zoom and pan (the acquisition has stopped). The generators
+        are out of the pool until `release()`, so the frames are not written meanwhile."""
+        self.timer.stop()
+        self._mailboxes.clear()
+        self._held = dict(self._shown)
+
+    def release(self):
+        """Plot the incoming frames again (the acquisition runs)."""
+        self._held = None
+
+    @property
+    def holding(self) -> bool:
+        return self._held is not None
+
+    def render_held(self, *_):
+        """Redraw the held frames over the current horizontal window of the canvas."""
+        if self._held is None or not self.parent.canvas:
+            return
+        t_start, t_end = self.parent.canvas.xlim
+        columns = plot_columns(self.parent.canvas)
+        for channel, pyramid in self._held.items():
+            if not isinstance(pyramid, MinMaxPyramid):
+                pyramid = self._held[channel] = MinMaxPyramid(*pyramid)
+            t, wfm = pyramid.render(t_start, t_end, columns)
+            set_plotted_signal(self.parent, channel, t, wfm)
+        self.parent.canvas.update_lines()
+        self.redraws += 1
+
+    def stats(self) -> dict[str, int]:
+        return {"deposited": self.deposited, "drawn": self.drawn, "discarded": self.discarded, "redraws": self.redraws}
+
+    def stop(self):
+        self.timer.stop()
+        logging.debug(f"Display compositor: {self.stats()}")
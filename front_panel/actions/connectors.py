@@ -6,11 +6,10 @@ from PyQt5 import QtWidgets
 def use_plug(self, connector: QtWidgets.QPushButton, channel, state: bool):
     if type(connector) is QtWidgets.QPushButton:
         logging.debug(f"Connector {connector.objectName()} is now {'enabled' if state else 'disabled'}.")
-        if channel == 1:
-            self.connector1_toggled.emit(state)
-        elif channel == 2:
-            self.connector2_toggled.emit(state)
+        connector_toggled = getattr(self, f"connector{channel}_toggled", None)
+        if connector_toggled is not None:
+            connector_toggled.emit(state)
         else:
-            logging.error("Only channels 1 and 2 are supported.")
+            logging.error(f"Channel {channel} has no connector.")
     else:
         logging.error("Connector is not a QPushButton object.")
\ No newline at end of file
@@ -5,7 +5,12 @@ So all changes that happen to plotted signals, labels and other user information
 import logging
 from decimal import Decimal
 
+import numpy as np
+
+from front_panel.actions.persistence import PersistenceAccumulator
 from packages.numbers.utils import get_multiplier_letter
+from settings import DEFAULT_PERSISTENCE_DECAY
+from signal_generator.time_axis import TimeAxis, as_array
 
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -36,30 +41,71 @@ def update_delay_label(self, delay):
         
     self.delayLabel.setText(f"Delay: {format_number(base)} {letter}s")
 
-def downsample(t, wfm, factor=10_000):
-    t_downsampled = t[::factor]
-    wfm_downsampled = wfm[::factor]
+MAX_PLOTTED_POINTS = 1400  # 2 points (min and max) per column of a 700 px wide plot
+
+def plot_columns(canvas) -> int:
+    """Pixel columns of the plot area of the drawing surface."""
+    if not hasattr(canvas, "plot_width"):
+        return MAX_PLOTTED_POINTS // 2
+    return canvas.plot_width()
+
+def downsample(t, wfm, columns=None):
+    """Reduce the signal to the minimum and the maximum of every pixel column, like the
+    peak detection of a real scope: a glitch narrower than a column still shows up as
+    a vertical stroke, and no more than 2*columns points are drawn."""
+    if columns is None:
+        columns = MAX_PLOTTED_POINTS // 2
+    n = len(wfm)
+    # Keep every point of short acquisitions (fast timebases at the real sample rate)
+    if n <= 2 * columns:
+        return t, wfm
+    
+    if n % columns == 0:
+        buckets = wfm.reshape(columns, -1)
+        lows, highs = buckets.min(axis=1), buckets.max(axis=1)
+        starts = np.arange(0, n, n // columns)
+    else:
+        starts = np.arange(columns, dtype=np.int64) * n // columns
+        lows, highs = np.minimum.reduceat(wfm, starts), np.maximum.reduceat(wfm, starts)
+    
+    # Both extremes of a column at the time of its first sample: (min, max) pairs draw it as a stroke
+    wfm_downsampled = np.empty(2 * columns, dtype=wfm.dtype)
+    wfm_downsampled[0::2] = lows
+    wfm_downsampled[1::2] = highs
+    t_columns = t.time(starts) if isinstance(t, TimeAxis) else np.asarray(t)[starts]
+    t_downsampled = np.repeat(t_columns, 2)
     return t_downsampled, wfm_downsampled
 
-def update_plotted_signal(self, channel, t, wfm):
+def set_plotted_signal(self, channel, t, wfm) -> bool:
+    """Put the signal of the channel on its line without redrawing the canvas."""
     if not self.canvas:
         logging.error("Activate front panel with activate_front_panel() from front_panel.__init__")
-        return
+        return False
     
-    t, wfm = downsample(t, wfm)
+    t, wfm = downsample(t, wfm, plot_columns(self.canvas))
+    t = as_array(t)  # materialise only the timepoints of short acquisitions
     
-    if channel == 1 and hasattr(self, "channel1"):
-        if self.channel1["Enabled"]:
-            self.canvas.channel1_line.set_data(t, wfm)
-        else:
-            self.canvas.channel1_line.set_data([], [])
-    elif channel == 2 and hasattr(self, "channel2"):
-        if self.channel2["Enabled"]:
-            self.canvas.channel2_line.set_data(t, wfm)
-        else:
-            self.canvas.channel2_line.set_data([], [])
-    else:
-        logging.error("Invalid channel number. Accepts only 1 and 2.")
-        return
-    
-    self.canvas.draw_idle()
\ No newline at end of file
+    if not hasattr(self, f"channel{channel}"):
+        logging.error(f"Channel {channel} has no plotted line.")
+        return False
+    if not getattr(self, f"channel{channel}")["Enabled"]:
+        t, wfm = t[:0], wfm[:0]
+    if not self.canvas.set_channel_data(channel, t, wfm):
+        logging.error(f"Channel {channel} has no plotted line.")
+        return False
+    return True
+
+def update_plotted_signal(self, channel, t, wfm):
+    if set_plotted_signal(self, channel, t, wfm):
+        self.canvas.update_lines()
+
+def toggle_persistence(self, state: bool):
+    """Press the **Persist** button to turn the digital phosphor display on or off. Every
+    acquisition leaves its trace on the screen, graded in intensity by how often the pixels
+    were hit; the older traces fade by the persistence decay of the Display settings per
+    acquisition (1 keeps them until the persistence is turned off)."""
+    accumulator = PersistenceAccumulator(getattr(self, "persistence_decay", DEFAULT_PERSISTENCE_DECAY)) if state else None
+    self.signalmanager.set_persistence(accumulator)
+    if not state and self.canvas:
+        self.canvas.set_persistence_image(None)
+        self.canvas.update_lines()
@@ -0,0 +1,153 @@
+"""Digital phosphor persistence of the displayed signals.
+
+Every complete acquisition of a channel is mapped to the pixel grid of the
+plot and counted into a hit-count image (one `bincount` over the flattened
+pixel indices of all its samples). Before the counts of an acquisition are
+added, the image of the channel decays by a constant factor, so the recent
+waveforms glow and the old ones fade; a factor of 1 keeps them forever
+(infinite persistence). The generators accumulate in their pool workers,
+the GUI only converts the images into an intensity-graded RGBA layer drawn
+under the live traces."""
+
+import threading
+
+import numpy as np
+from numpy.typing import NDArray
+
+from settings import DEFAULT_PERSISTENCE_DECAY
+from signal_generator.time_axis import TimeAxis
+
+BLOCK_SIZE = 1 << 20  # samples mapped per block (bounds the temporaries to a few MB)
+CHANNEL_COLORS = {1: (255, 255, 123), 2: (238, 107, 238)}  # as the live traces
+
+
+class PersistenceAccumulator:
+    """Decaying hit-count images of the channels over the current plot geometry.
+
+    `configure()` is called from the GUI with the pixel size and the limits of the plot;
+    a change of the geometry clears the images (the old hits are at the wrong pixels).
+    `accumulate()` may be called from any thread."""
+
+    def __init__(self, decay: float = DEFAULT_PERSISTENCE_DECAY):
+        self.decay = min(max(float(decay), 0.0), 1.0)
+        self._geometry: tuple | None = None  # width, height, xlim, {channel: ylim}
+        self._images: dict[int, NDArray] = {}  # channel -> float32 (height, width) hit counts
+        self._lock = threading.Lock()
+        self.acquisitions = 0
+
+    @property
+    def infinite(self) -> bool:
+        return self.decay >= 1.0
+
+    def configure(self, width: int, height: int, xlim: tuple, ylims: dict[int, tuple]) -> bool:
+        """Take the geometry of the plot. True when it changed (and the images were cleared)."""
+        geometry = (int(width), int(height), tuple(map(float, xlim)), {c: tuple(map(float, y)) for c, y in ylims.items()})
+        if geometry == self._geometry:
+            return False
+        with self._lock:
+            self._geometry = geometry
+            self._images.clear()
+        return True
+
+    def clear(self):
+        with self._lock:
+            self._images.clear()
+
+    def accumulate(self, channel: int, t: "TimeAxis | NDArray", wfm: NDArray):
+        """Add the hits of an acquisition of the channel (decaying the older ones first)."""
+        geometry = self._geometry
+        if geometry is None or channel not in geometry[3]:
+            return
+        width, height, (x0, x1), ylims = geometry
+        y0, y1 = ylims[channel]
+        x_scale, y_scale = width / (x1 - x0), height / (y1 - y0)
+
+        # Samples off the plot are counted in a one-pixel frame around it (clipping is
+        # cheaper than selecting the samples inside), which is cropped at the end
+        padded_width, padded_height = width + 2, height + 2
+        n = len(wfm)
+        hits = np.zeros(padded_width * padded_height, dtype=np.int64)
+        block = min(BLOCK_SIZE, n)
+        columns, rows = np.empty(block, dtype=np.float32), np.empty(block, dtype=np.float32)
+        index, row_index = np.empty(block, dtype=np.int32), np.empty(block, dtype=np.int32)
+        for start in range(0, n, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, n)
+            m = stop - start
+            column, row = columns[:m], rows[:m]
+            # Pixel of every sample (+1 for the frame): column from the time axis, row from the top
+            if isinstance(t, TimeAxis):
+                t[start:stop].affine(column, x_scale, 1 - x0 * x_scale)
+            else:
+                np.multiply(np.subtract(t[start:stop], x0), x_scale, out=column)
+                column += 1
+            np.subtract(y1, wfm[start:stop], out=row)
+            row *= y_scale
+            row += 1
+            np.clip(column, 0, width + 1, out=column)
+            np.clip(row, 0, height + 1, out=row)
+            np.copyto(index[:m], column, casting="unsafe")  # non-negative: truncation is floor
+            np.copyto(row_index[:m], row, casting="unsafe")
+            row_index[:m] *= padded_width
+            index[:m] += row_index[:m]
+            hits += np.bincount(index[:m], minlength=padded_width * padded_height)
+        hits = hits.reshape(padded_height, padded_width)[1:-1, 1:-1].astype(np.float32)
+
+        with self._lock:
+            if self._geometry is not geometry:
+                return  # the plot changed meanwhile
+            image = self._images.get(channel)
+            if image is None:
+                self._images[channel] = hits
+            else:
+                if not self.infinite:
+                    image *= self.decay
+                image += hits
+            self.acquisitions += 1
+
+    def render(self) -> NDArray | None:
+        """Intensity-graded (height, width, 4) uint8 RGBA layer of all channels, None while
+        nothing was accumulated. The intensity follows the logarithm of the hits."""
+        with self._lock:
+            images = {channel: image.copy() for channel, image in self._images.items()}
+        if not images:
+            return None
+
+        height, width = next(iter(images.values())).shape
+        rgb = np.zeros((height, width, 3), dtype=np.float32)
+        alpha = np.zeros((height, width), dtype=np.float32)
+        for channel, image in images.items():
+            peak = image.max()
+            if peak <= 0:
+                continue
+            intensity = np.log1p(image, out=image)
+            intensity /= np.log1p(peak)
+            rgb += intensity[..., None] * np.array(CHANNEL_COLORS.get(channel, (255, 255, 255)), dtype=np.float32)
+            np.maximum(alpha, intensity, out=alpha)
+
+        rgba = np.empty((height, width, 4), dtype=np.uint8)
+        np.clip(rgb, 0, 255, out=rgb)
+        rgba[..., :3] = rgb
+        rgba[..., 3] = alpha * 255
+        return rgba
+
+
+if __name__ == "__main__":
+    import time
+
+    from signal_generator import mem_depth
+
+    accumulator = PersistenceAccumulator()
+    accumulator.configure(900, 600, (-5e-6, 5e-6), {1: (-4, 4)})
+    rng = np.random.default_rng(0)
+    for n in [14_000, 1_400_000, int(mem_depth)]:
+        t = TimeAxis.from_timebase(1e-6, n)
+        wfm = (np.sin(2 * np.pi * 1e6 * t.materialize()) + rng.normal(0, 0.05, n)).astype(np.float32)
+        accumulator.accumulate(1, t, wfm)
+        tic = time.perf_counter()
+        for _ in range(5):
+            accumulator.accumulate(1, t, wfm)
+        elapsed = (time.perf_counter() - tic) / 5
+        print(f"{n:>9} samples: {elapsed * 1e3:6.1f} ms per acquisition ({1 / elapsed:.0f} acquisitions/s)")
+    tic = time.perf_counter()
+    image = accumulator.render()
+    print(f"Rendering the {image.shape[1]} x {image.shape[0]} layer: {(time.perf_counter() - tic) * 1e3:.1f} ms")
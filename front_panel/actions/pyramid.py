@@ -0,0 +1,91 @@
+"""Min/max pyramid over a stored acquisition for zoom and pan while stopped.
+
+When the acquisition is stopped, the horizontal knobs zoom and pan over the
+data already in memory instead of asking for a new acquisition. Decimating
+14 Mpts again on every knob step would be too slow, so every level of the
+pyramid keeps the minimum and the maximum of `FACTOR` buckets of the level
+below. A window of any position and width is drawn from the coarsest level
+whose buckets are not wider than a pixel column, i.e. in O(pixels) whatever
+the memory depth.
+
+The pyramids draw the main window only: the display has no zoom window
+(the lower pane of `use_zoom_function`) yet."""
+
+import numpy as np
+from numpy.typing import NDArray
+
+from signal_generator.time_axis import TimeAxis
+
+FACTOR = 8  # buckets merged per level
+
+
+class MinMaxPyramid:
+    """Levels of (lows, highs), bucket size FACTOR**(level + 1) samples, over a copy of
+    the samples (the frame buffers are reused by the generators)."""
+
+    def __init__(self, t: "TimeAxis | NDArray", wfm: NDArray, factor: int = FACTOR):
+        if not isinstance(t, TimeAxis):
+            t = np.asarray(t)
+            t = TimeAxis(float(t[0]), float(t[-1] - t[0]) / max(1, len(t) - 1), len(t))
+        self.t = t
+        self.factor = int(factor)
+        self.samples = np.array(wfm, copy=True)
+        self.levels: list[tuple[NDArray, NDArray]] = []
+
+        lows = highs = self.samples
+        while len(lows) >= 2 * self.factor:
+            starts = np.arange(0, len(lows), self.factor)
+            lows, highs = np.minimum.reduceat(lows, starts), np.maximum.reduceat(highs, starts)
+            self.levels.append((lows, highs))
+
+    def __len__(self) -> int:
+        return len(self.samples)
+
+    def render(self, t_start: float, t_end: float, columns: int) -> tuple[NDArray, NDArray]:
+        """(min, max) pairs of every pixel column of the window [t_start, t_end), as
+        `display.downsample()` draws them; the samples themselves when they are few."""
+        k0, k1 = self.t.index(t_start), self.t.index(t_end)
+        n = k1 - k0
+        if n <= 2 * columns:
+            return self.t.time(np.arange(k0, k1)), self.samples[k0:k1]
+
+        # Coarsest level whose buckets fit in a column
+        level, bucket = -1, 1
+        while level + 1 < len(self.levels) and bucket * self.factor <= n / columns:
+            level, bucket = level + 1, bucket * self.factor
+        lows, highs = self.levels[level] if level >= 0 else (self.samples, self.samples)
+
+        starts = k0 + np.arange(columns, dtype=np.int64) * n // columns  # first sample of each column
+        buckets = starts // bucket  # strictly increasing (a column spans at least one bucket)
+        first, last = buckets[0], (k1 - 1) // bucket + 1
+        offsets = buckets - first
+
+        wfm = np.empty(2 * columns, dtype=self.samples.dtype)
+        wfm[0::2] = np.minimum.reduceat(lows[first:last], offsets)
+        wfm[1::2] = np.maximum.reduceat(highs[first:last], offsets)
+        return np.repeat(self.t.time(starts), 2), wfm
+
+
+if __name__ == "__main__":
+    import time
+
+    from signal_generator import mem_depth
+
+    n = int(mem_depth)
+    t = TimeAxis.from_timebase(1e-3, n)
+    wfm = np.sin(2 * np.pi * 1e3 * t.materialize()).astype(np.float32)
+    wfm[n // 3] = 5  # single-sample glitch
+
+    tic = time.perf_counter()
+    pyramid = MinMaxPyramid(t, wfm)
+    print(f"Pyramid of {n} points ({len(pyramid.levels)} levels) built in {(time.perf_counter() - tic) * 1e3:.1f} ms")
+
+    columns = 1000
+    for zoom in [1, 10, 1000, 100_000]:
+        width = (t.t_end - t.t0) / zoom
+        start = t.time(n // 3) - width / 2
+        tic = time.perf_counter()
+        for _ in range(100):
+            x, y = pyramid.render(start, start + width, columns)
+        elapsed = (time.perf_counter() - tic) / 100
+        print(f"Zoom x{zoom}: {len(x)} points in {elapsed * 1e6:.0f} us, glitch visible: {y.max() == 5}")
@@ -10,6 +10,7 @@ from matplotlib import transforms
 from matplotlib.backends.backend_qtagg import FigureCanvasQTAgg
 from matplotlib.figure import Figure
 from matplotlib.patches import Polygon
+from PyQt5.QtCore import pyqtSignal
 
 from front_panel.custom_widgets.offset_indicators import VerticalOffsetIndicator
 from signal_generator import N_TDIV, N_VDIV
@@ -18,6 +19,10 @@ matplotlib.use("Qt5Agg")
 
 
 class MplCanvas(FigureCanvasQTAgg):
+    """Matplotlib implementation of the `DisplaySurface`."""
+
+    geometry_changed = pyqtSignal()
+
     def __init__(self, parent=None, width=5, height=4, dpi=180, **kwargs):
         self.parent = parent
         plt.style.use("dark_background")
@@ -93,11 +98,79 @@ class MplCanvas(FigureCanvasQTAgg):
             visible=self.parent.channel2.Enabled if self.parent is not None else False,
         )
         # Initialize plot lines for channels:
-        (self.channel1_line,) = self.axes1.plot([], [], color="#ffff7b", linewidth=0.5)
-        (self.channel2_line,) = self.axes2.plot([], [], color="#ee6bee", linewidth=0.5)
+        # (animated: left out of the full draws and blitted over the cached background)
+        (self.channel1_line,) = self.axes1.plot([], [], color="#ffff7b", linewidth=0.5, animated=True)
+        (self.channel2_line,) = self.axes2.plot([], [], color="#ee6bee", linewidth=0.5, animated=True)
 
         super().__init__(fig)
 
+        # BLITTING: everything but the signal lines (grid, spines, trigger marks, offset
+        # indicators) is cached after every full draw; a frame restores it and draws the lines only
+        self._background = None
+        self.persistence_image = None  # AxesImage of the persistence display (animated as well)
+        self.mpl_connect("draw_event", self._on_draw)
+
+    def set_channel_data(self, channel: int, t: NDArray, wfm: NDArray) -> bool:
+        line = getattr(self, f"channel{channel}_line", None)
+        if line is None:
+            return False
+        line.set_data(t, wfm)
+        return True
+
+    def plot_width(self) -> int:
+        """Pixel columns of the plot area (the axes, not the whole canvas)."""
+        return max(1, int(self.axes1.bbox.width))
+
+    def plot_height(self) -> int:
+        return max(1, int(self.axes1.bbox.height))
+
+    def set_persistence_image(self, rgba: NDArray | None):
+        """Show the persistence layer over the axes, blitted under the lines."""
+        if rgba is None:
+            if self.persistence_image is not None:
+                self.persistence_image.set_visible(False)
+            return
+        extent = (*self.axes1.get_xlim(), *self.axes1.get_ylim())
+        if self.persistence_image is None:
+            self.persistence_image = self.axes1.imshow(
+                rgba, extent=extent, origin="upper", aspect="auto", interpolation="nearest", animated=True, zorder=0
+            )
+        else:
+            self.persistence_image.set_data(rgba)
+            self.persistence_image.set_extent(extent)
+        self.persistence_image.set_visible(True)
+
+    @property
+    def signal_lines(self):
+        return [self.channel1_line, self.channel2_line]
+
+    def _on_draw(self, event):
+        """Cache the static background of a full draw and put the lines over it. The plot
+        area and the limits only change with a full draw (resize, zoom, offset)."""
+        self._background = self.copy_from_bbox(self.figure.bbox)
+        self._draw_lines()
+        self.geometry_changed.emit()
+
+    def _draw_lines(self):
+        if self.persistence_image is not None and self.persistence_image.get_visible():
+            self.figure.draw_artist(self.persistence_image)
+        for line in self.signal_lines:
+            self.figure.draw_artist(line)
+
+    def draw_idle(self, *args, **kwargs):
+        """Full redraw of a changed background (limits, grid, indicators) on the next event loop."""
+        self._background = None
+        super().draw_idle(*args, **kwargs)
+
+    def update_lines(self):
+        """Fast path of a new frame: restore the cached background and blit the lines over it."""
+        if self._background is None:
+            self.draw_idle()  # the full draw caches the background and draws the lines
+            return
+        self.restore_region(self._background)
+        self._draw_lines()
+        self.blit(self.figure.bbox)
+
     def draw_trigger_triangle(self):
         """Draws trigger position triangle using axes coordinates (independent of data)"""
         # Coordinates of the triangle vertices in axes coordinates
@@ -197,7 +270,7 @@ class MplCanvas(FigureCanvasQTAgg):
             logging.debug(f"Unsupported axis_number {axis_number}")
 
         self.update_grid()
-        self.draw()
+        self.draw_idle()
 
     def update_grid(self):
         """The grid has to be determined only for one axis. No need to implement for self.axes2"""
@@ -0,0 +1,307 @@
+"""QPainter implementation of the drawing surface.
+
+Matplotlib builds its paths through Python objects and rasterizes them with
+Agg before Qt shows the result. `RasterCanvas` maps the samples to pixels
+with NumPy straight into the memory of a `QPolygonF` (no Python object per
+point) and lets QPainter draw the polylines over a cached pixmap of the
+grid, the trigger marks and the offset indicators (and over the persistence
+image, shown straight from its NumPy buffer as a `QImage`)."""
+
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+from PyQt5.QtCore import QPointF, QRectF, Qt, pyqtSignal
+from PyQt5.QtGui import QColor, QImage, QPainter, QPainterPath, QPen, QPixmap, QPolygonF
+from PyQt5.QtWidgets import QSizePolicy, QWidget
+
+from signal_generator import N_TDIV, N_VDIV
+
+BACKGROUND_COLOR = QColor("black")
+GRID_COLOR = QColor("#666666")
+TRIGGER_COLOR = QColor("lightblue")
+LINE_COLORS = {1: QColor("#ffff7b"), 2: QColor("#ee6bee")}
+MARGIN = 4  # px around the plot area
+INDICATOR_MARGIN = 16  # px left of the plot area for the offset indicators
+
+
+def polygon_from_arrays(x: NDArray, y: NDArray) -> QPolygonF:
+    """`QPolygonF` of the points (x, y) written through its buffer (QPointF is two doubles)."""
+    n = len(x)
+    polygon = QPolygonF(n)
+    if n:
+        buffer = polygon.data()
+        buffer.setsize(n * 2 * np.dtype(np.float64).itemsize)
+        points = np.frombuffer(buffer, dtype=np.float64).reshape(n, 2)  # type: ignore
+        points[:, 0] = x
+        points[:, 1] = y
+    return polygon
+
+
+class RasterOffsetIndicator:
+    """Vertical offset marker left of the plot area (same interface as `VerticalOffsetIndicator`)."""
+
+    def __init__(self, canvas: "RasterCanvas", start_y=0.1, label="", color="black", visible=False):
+        self.canvas = canvas
+        self.start_y = float(start_y)  # axes coordinates (0 bottom, 1 top)
+        self.label = label
+        self.color = QColor(color)
+        self.visible = visible
+
+    def hide(self):
+        self.visible = False
+        self.canvas.draw_idle()
+
+    def show(self):
+        self.visible = True
+        self.canvas.draw_idle()
+
+    def update_position(self, new_start_y, visible):
+        self.start_y = float(new_start_y)
+        self.visible = visible
+        self.canvas.draw_idle()
+
+    def paint(self, painter: QPainter, plot: QRectF):
+        if not self.visible:
+            return
+        y = plot.bottom() - min(max(self.start_y, 0.0), 1.0) * plot.height()
+        right, size = plot.left(), INDICATOR_MARGIN - 2
+        path = QPainterPath()
+        path.moveTo(right - size, y - size / 3)
+        path.lineTo(right - size / 3, y - size / 3)
+        path.lineTo(right, y)
+        path.lineTo(right - size / 3, y + size / 3)
+        path.lineTo(right - size, y + size / 3)
+        path.closeSubpath()
+        painter.fillPath(path, self.color)
+        painter.setPen(QColor("black"))
+        font = painter.font()
+        font.setBold(True)
+        font.setPixelSize(max(6, int(size * 0.6)))
+        painter.setFont(font)
+        painter.drawText(QRectF(right - size, y - size / 3, size * 2 / 3, size * 2 / 3), Qt.AlignCenter, self.label)  # type: ignore
+
+
+class RasterCanvas(QWidget):
+    """QPainter implementation of the `DisplaySurface`."""
+
+    geometry_changed = pyqtSignal()
+
+    def __init__(self, parent=None, width=5, height=4, dpi=180, **kwargs):
+        super().__init__()
+        self.parent = parent
+        self.setSizePolicy(QSizePolicy.Expanding, QSizePolicy.Expanding)
+        self.setMinimumSize(int(width * 20), int(height * 20))
+        self.setAttribute(Qt.WA_OpaquePaintEvent, True)  # type: ignore
+
+        self.xlim = kwargs["xlim"] if "xlim" in kwargs else (-1, 1)
+        self.ylim1 = kwargs["ylim1"] if "ylim1" in kwargs else (-1, 1)
+        self.ylim2 = kwargs["ylim2"] if "ylim2" in kwargs else (-1, 1)
+
+        self.channel1_offset_indicator = RasterOffsetIndicator(
+            self, start_y=0.1, label="1", color="yellow",
+            visible=self.parent.channel1.Enabled if self.parent is not None else False,
+        )
+        self.channel2_offset_indicator = RasterOffsetIndicator(
+            self, start_y=0.2, label="2", color="magenta",
+            visible=self.parent.channel2.Enabled if self.parent is not None else False,
+        )
+
+        self._data: dict[int, tuple[NDArray, NDArray]] = {}  # samples of every channel line
+        self._polygons: dict[int, QPolygonF] = {}  # the lines in pixels (cleared on any change)
+        self._background: QPixmap | None = None  # grid, trigger marks and indicators
+        self._persistence: tuple[NDArray, QImage] | None = None  # RGBA layer and its QImage view
+
+    # GEOMETRY
+
+    def _plot_rect(self) -> QRectF:
+        return QRectF(
+            MARGIN + INDICATOR_MARGIN,
+            MARGIN,
+            max(1, self.width() - 2 * MARGIN - INDICATOR_MARGIN),
+            max(1, self.height() - 2 * MARGIN),
+        )
+
+    def plot_width(self) -> int:
+        return max(1, int(self._plot_rect().width() * self.devicePixelRatioF()))
+
+    def plot_height(self) -> int:
+        return max(1, int(self._plot_rect().height() * self.devicePixelRatioF()))
+
+    def _ylim(self, channel: int) -> tuple[float, float]:
+        return self.ylim1 if channel == 1 else self.ylim2
+
+    def data_to_axes(self, data_coordinate: float, axis: str, axis_number: int = 1):
+        """Return axes coordinates aware of y-axis offset"""
+        if axis == "x":
+            lim_min, lim_max = self.xlim
+        elif axis == "y":
+            if axis_number not in (1, 2):
+                logging.debug(f"Unsupported axis_number {axis_number}")
+                return
+            if self.parent is None:
+                logging.debug("RasterCanvas parent is None.")
+                return
+            offset_data = self.parent.channel1.Offset if axis_number == 1 else self.parent.channel2.Offset
+            lim_min, lim_max = self._ylim(axis_number)
+            lim_min, lim_max = lim_min + float(offset_data), lim_max + float(offset_data)
+        else:
+            logging.debug(f"Unsupported axis {axis}")
+            return
+
+        return (data_coordinate - lim_min) / (lim_max - lim_min)
+
+    def axes_to_data(self, axes_coordinate: float, axis: str, axis_number: int = 1):
+        if axis == "x":
+            lim_min, lim_max = self.xlim
+        elif axis == "y":
+            if axis_number not in (1, 2):
+                logging.debug(f"Unsupported axis_number {axis_number}")
+                return
+            lim_min, lim_max = self._ylim(axis_number)
+        else:
+            logging.debug(f"Unsupported axis {axis}")
+            return
+
+        return axes_coordinate * (lim_max - lim_min) + lim_min
+
+    # LINES
+
+    def set_channel_data(self, channel: int, t: NDArray, wfm: NDArray) -> bool:
+        if channel not in LINE_COLORS:
+            return False
+        self._data[channel] = (t, wfm)
+        self._polygons.pop(channel, None)
+        return True
+
+    def _polygon(self, channel: int, plot: QRectF) -> QPolygonF:
+        """The line of the channel in pixels (one vectorised transform)."""
+        polygon = self._polygons.get(channel)
+        if polygon is None:
+            t, wfm = self._data[channel]
+            (x0, x1), (y0, y1) = self.xlim, self._ylim(channel)
+            x = (np.asarray(t, dtype=np.float64) - x0) * (plot.width() / (x1 - x0)) + plot.left()
+            y = (y1 - np.asarray(wfm, dtype=np.float64)) * (plot.height() / (y1 - y0)) + plot.top()
+            polygon = self._polygons[channel] = polygon_from_arrays(x, y)
+        return polygon
+
+    def set_persistence_image(self, rgba: NDArray | None):
+        if rgba is None:
+            self._persistence = None
+            return
+        rgba = np.ascontiguousarray(rgba)
+        height, width = rgba.shape[:2]
+        # The QImage shares the buffer of the array, which is kept alongside it
+        self._persistence = rgba, QImage(rgba.data, width, height, 4 * width, QImage.Format_RGBA8888)
+
+    def update_lines(self):
+        self.update()
+
+    # STATIC CONTENT
+
+    def draw_idle(self, *args, **kwargs):
+        """Repaint the background (limits, grid, indicators) with the next paint."""
+        self._background = None
+        self._polygons.clear()
+        self.update()
+
+    def update_chart(self, xlim=None, ylim=None, axis_number=1):
+        self.xlim = tuple(map(float, xlim)) if xlim is not None else self.xlim
+        ylim = tuple(map(float, ylim)) if ylim is not None else self.ylim1
+        if axis_number == 1:
+            self.ylim1 = ylim
+        elif axis_number == 2:
+            self.ylim2 = ylim
+        else:
+            logging.debug(f"Unsupported axis_number {axis_number}")
+        self.draw_idle()
+        self.geometry_changed.emit()
+
+    def update_trigger_triangle_position(self, *args):
+        self.draw_idle()
+
+    def _paint_background(self) -> QPixmap:
+        ratio = self.devicePixelRatioF()
+        pixmap = QPixmap(int(self.width() * ratio), int(self.height() * ratio))
+        pixmap.setDevicePixelRatio(ratio)
+        pixmap.fill(BACKGROUND_COLOR)
+        plot = self._plot_rect()
+
+        painter = QPainter(pixmap)
+        painter.setPen(QPen(GRID_COLOR, 0))
+        for i in range(N_TDIV + 1):
+            x = plot.left() + plot.width() * i / N_TDIV
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+        for i in range(N_VDIV + 1):
+            y = plot.top() + plot.height() * i / N_VDIV
+            painter.drawLine(QPointF(plot.left(), y), QPointF(plot.right(), y))
+
+        # Trigger line and triangle at t = 0
+        trigger = self.data_to_axes(0, axis="x")
+        if trigger is not None and 0 <= trigger <= 1:
+            x = plot.left() + trigger * plot.width()
+            painter.setPen(QPen(TRIGGER_COLOR, 0, Qt.DashLine))  # type: ignore
+            painter.drawLine(QPointF(x, plot.top()), QPointF(x, plot.bottom()))
+            h = 0.04 * plot.height()
+            path = QPainterPath()
+            path.moveTo(x, plot.top() + h)
+            path.lineTo(x - h / np.sqrt(3), plot.top())
+            path.lineTo(x + h / np.sqrt(3), plot.top())
+            path.closeSubpath()
+            painter.fillPath(path, TRIGGER_COLOR)
+
+        painter.setRenderHint(QPainter.Antialiasing, True)
+        for indicator in (self.channel2_offset_indicator, self.channel1_offset_indicator):
+            indicator.paint(painter, plot)
+        painter.end()
+        return pixmap
+
+    def paintEvent(self, event):
+        if self._background is None or self._background.size() != self.size() * self.devicePixelRatioF():
+            self._background = self._paint_background()
+        painter = QPainter(self)
+        painter.drawPixmap(0, 0, self._background)
+        plot = self._plot_rect()
+        if self._persistence is not None:
+            painter.drawImage(plot, self._persistence[1])
+        painter.setClipRect(plot)
+        for channel in sorted(self._data):
+            painter.setPen(QPen(LINE_COLORS[channel], 0))  # cosmetic pen (1 px)
+            painter.drawPolyline(self._polygon(channel, plot))
+        painter.end()
+
+    def resizeEvent(self, event):
+        self._background = None
+        self._polygons.clear()
+        super().resizeEvent(event)
+        self.geometry_changed.emit()
+
+
+if __name__ == "__main__":
+    import time
+
+    from PyQt5.QtWidgets import QApplication
+
+    app = QApplication([])
+    from front_panel.custom_widgets.chart import MplCanvas
+
+    frames = 50
+    for surface_class in (MplCanvas, RasterCanvas):
+        canvas = surface_class()
+        canvas.resize(900, 600)
+        canvas.show()
+        app.processEvents()
+        for points in (1_000, 10_000, 100_000):
+            t = np.linspace(-1, 1, points)
+            waves = [np.sin(20 * t + k) * 0.8 for k in range(frames)]
+            canvas.set_channel_data(1, t, waves[-1])
+            canvas.draw_idle()
+            app.processEvents()
+            tic = time.perf_counter()
+            for wfm in waves:
+                canvas.set_channel_data(1, t, wfm)
+                canvas.set_channel_data(2, t, -wfm)
+                canvas.update_lines()
+                app.processEvents()
+            elapsed = time.perf_counter() - tic
+            print(f"{surface_class.__name__:<12} {points:>7} points: {frames / elapsed:6.1f} frames/s")
@@ -0,0 +1,78 @@
+"""Drawing surface of the oscilloscope screen.
+
+The front panel talks to the screen through `DisplaySurface` only: a line
+per channel, the axis limits with their grid, the vertical offset
+indicators, the trigger marker and the persistence layer. `MplCanvas` implements it on top of
+Matplotlib, `RasterCanvas` paints it directly with QPainter from the NumPy
+buffers. The backend is chosen by the "Display" settings."""
+
+import logging
+from typing import Protocol
+
+from numpy.typing import NDArray
+from PyQt5.QtCore import pyqtBoundSignal
+
+from settings import DEFAULT_DISPLAY_BACKEND
+
+display_backends = ["matplotlib", "qpainter"]
+
+
+class OffsetIndicator(Protocol):
+    def show(self): ...
+
+    def hide(self): ...
+
+    def update_position(self, new_start_y, visible): ...
+
+
+class DisplaySurface(Protocol):
+    xlim: tuple[float, float]
+    ylim1: tuple[float, float]
+    ylim2: tuple[float, float]
+    channel1_offset_indicator: OffsetIndicator
+    channel2_offset_indicator: OffsetIndicator
+    geometry_changed: pyqtBoundSignal  # the plot area or the axis limits changed
+
+    def set_channel_data(self, channel: int, t: NDArray, wfm: NDArray) -> bool:
+        """Put the samples on the line of the channel (drawn by the next `update_lines()`).
+        False when the surface has no line for the channel."""
+        ...
+
+    def plot_width(self) -> int:
+        """Pixel columns of the plot area."""
+        ...
+
+    def plot_height(self) -> int:
+        """Pixel rows of the plot area."""
+        ...
+
+    def set_persistence_image(self, rgba: NDArray | None):
+        """(rows, columns, 4) uint8 layer over the plot area under the lines (None: no layer)."""
+        ...
+
+    def update_lines(self):
+        """Show the current lines (fast path of a new frame)."""
+        ...
+
+    def draw_idle(self):
+        """Redraw everything (limits, grid, indicators) on the next event loop."""
+        ...
+
+    def update_chart(self, xlim=None, ylim=None, axis_number=1): ...
+
+    def update_trigger_triangle_position(self): ...
+
+    def data_to_axes(self, data_coordinate: float, axis: str, axis_number: int = 1): ...
+
+
+def get_surface_class(backend: str):
+    """Class of the drawing surface of the backend."""
+    if backend not in display_backends:
+        logging.error(f"Unknown display backend {backend}. Using {DEFAULT_DISPLAY_BACKEND}.")
+    if backend == "qpainter":
+        from front_panel.custom_widgets.raster_chart import RasterCanvas
+
+        return RasterCanvas
+    from front_panel.custom_widgets.chart import MplCanvas
+
+    return MplCanvas
@@ -15,4 +15,30 @@ def print_memory_stats(start_snapshot, end_snapshot):
     for index, stat in enumerate(stats[:10], 1):
         print(f"{index}: {stat}")
         for line in stat.traceback.format():
-            print(line)
\ No newline at end of file
+            print(line)
+
+def measure_peak_allocation(func, *args, **kwargs) -> int:
+    """Peak of the memory [bytes] allocated while `func(*args, **kwargs)` runs.
+    NumPy buffers are traced too, so this catches hidden full-size temporaries."""
+    was_tracing = tracemalloc.is_tracing()
+    if not was_tracing:
+        tracemalloc.start()
+    tracemalloc.reset_peak()
+    start, _ = tracemalloc.get_traced_memory()
+    try:
+        func(*args, **kwargs)
+        _, peak = tracemalloc.get_traced_memory()
+    finally:
+        if not was_tracing:
+            tracemalloc.stop()
+    return peak - start
+
+
+def assert_steady_state_allocations(func, limit: int, *args, warmup: int = 1, frames: int = 3, **kwargs):
+    """Call `func` `warmup` times (caches, lazy buffers) and check that none of the next
+    `frames` calls allocates more than `limit` bytes at its peak."""
+    for _ in range(warmup):
+        func(*args, **kwargs)
+    for frame in range(frames):
+        peak = measure_peak_allocation(func, *args, **kwargs)
+        assert peak <= limit, f"Frame {frame} allocated {peak} B (limit {limit} B) in {func.__name__}"
@@ -0,0 +1,5 @@
+"""Settings of the oscilloscope and the defaults the front panel shares with them."""
+
+# DISPLAY
+DEFAULT_DISPLAY_BACKEND = "matplotlib"  # drawing surface: "matplotlib" or "qpainter"
+DEFAULT_PERSISTENCE_DECAY = 0.8  # persistence image kept per acquisition (1: infinite persistence)
@@ -1,6 +1,7 @@
 from decimal import Decimal
 import json
 
+from settings import DEFAULT_DISPLAY_BACKEND, DEFAULT_PERSISTENCE_DECAY
 from settings.channel import Channel
 
 
@@ -87,6 +88,14 @@ class SettingsManager:
     acquisition = "Normal"
     sinxx = "Sinx"
     mem_depth = 14e6  # points
+    # signal generation in the worker pool ("thread"), in worker processes ("process")
+    # or for all channels at once over one time axis ("batched")
+    backend = "thread"
+    waveform_rate = 60  # target waveforms per second (0: as fast as the display takes them)
+
+    # Display
+    display_backend = DEFAULT_DISPLAY_BACKEND  # drawing surface: "matplotlib" or "qpainter"
+    persistence_decay = DEFAULT_PERSISTENCE_DECAY  # persistence image kept per acquisition (1: infinite)
 
     # Trigger
     trigger = default_trigger
@@ -132,6 +141,12 @@ class SettingsManager:
         self.acquisition = "Normal"
         self.sinxx = "Sinx"
         self.mem_depth = 14e6  # points
+        self.backend = "thread"
+        self.waveform_rate = 60
+
+        # Display
+        self.display_backend = DEFAULT_DISPLAY_BACKEND
+        self.persistence_decay = DEFAULT_PERSISTENCE_DECAY
 
         # Trigger
         self.trigger = self.default_trigger
@@ -158,6 +173,12 @@ class SettingsManager:
                 "acquisition": self.acquisition,
                 "sinxx": self.sinxx,
                 "mem_depth": self.mem_depth,
+                "backend": self.backend,
+                "waveform_rate": self.waveform_rate,
+            },
+            "Display": {
+                "backend": self.display_backend,
+                "persistence_decay": self.persistence_decay,
             },
             "Trigger": self.trigger,
         }
@@ -176,6 +197,10 @@ class SettingsManager:
             self.acquisition = self.settings["Acquire"]["acquisition"]
             self.sinxx = self.settings["Acquire"]["sinxx"]
             self.mem_depth = self.settings["Acquire"]["mem_depth"]
+            self.backend = self.settings["Acquire"].get("backend", "thread")
+            self.waveform_rate = self.settings["Acquire"].get("waveform_rate", 60)
+            self.display_backend = self.settings.get("Display", {}).get("backend", DEFAULT_DISPLAY_BACKEND)
+            self.persistence_decay = self.settings.get("Display", {}).get("persistence_decay", DEFAULT_PERSISTENCE_DECAY)
 
             self.trigger = self.settings["Trigger"]
         else:
@@ -1,4 +1,13 @@
 mem_depth = 14E6  # number of datapoints in memory
+MAX_SAMPLE_RATE = 1E9  # maximum real-time sample rate [Sa/s]
 N_TDIV = 10  # number of horizontal divisions
 N_VDIV = 10  # number of vertical divisions
-DIAL_PREC_FACT = N_VDIV*5
\ No newline at end of file
+DIAL_PREC_FACT = N_VDIV*5
+
+# SIGNAL SOURCES
+N_ANALOG_CHANNELS = 2  # analog input channels of the front panel (CH1, CH2, ...)
+
+
+def channel_sources(n_channels: int = N_ANALOG_CHANNELS) -> tuple[int, ...]:
+    """Identifiers of the analog channels 1..n_channels, the signal sources with a plotted line."""
+    return tuple(range(1, n_channels + 1))
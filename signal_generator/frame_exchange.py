@@ -0,0 +1,114 @@
+"""Triple-buffered handoff of the acquired frames from a generator to the display.
+
+The writer fills the back buffer, the reader keeps the front buffer for as
+long as it draws it, and the "latest complete" buffer sits in between. Publishing
+and reading only swap buffer indices under a lock, so nothing is copied, the
+writer never touches the buffer being drawn (no torn frames), and a frame
+that is replaced before it was read is counted as dropped."""
+
+from dataclasses import dataclass
+import threading
+
+import numpy as np
+from numpy.typing import NDArray
+
+from signal_generator.time_axis import TimeAxis
+
+
+@dataclass
+class Frame:
+    data: NDArray  # preallocated buffer of the full capacity
+    sequence: int = 0  # 1, 2, ... in the order of publishing (0: never written)
+    t: TimeAxis | None = None
+    n: int = 0  # samples of `data` that belong to the frame (per channel)
+    channels: tuple | None = None  # channels of a batched frame (one row of n samples each)
+
+    @property
+    def wfm(self) -> NDArray:
+        """The samples, as (channels x n) rows for a batched frame."""
+        if self.channels is None:
+            return self.data[: self.n]
+        return self.data[: len(self.channels) * self.n].reshape(len(self.channels), self.n)
+
+
+class TripleBuffer:
+    """Lock-protected rotation of three preallocated frames between one writer and one reader."""
+
+    def __init__(self, capacity: int, dtype=np.float32):
+        self._frames = [Frame(np.empty(int(capacity), dtype=dtype)) for _ in range(3)]
+        self._back, self._latest, self._front = 0, 1, 2
+        self._fresh = False  # the latest frame has not been read yet
+        self._lock = threading.Lock()
+
+        # COUNTERS
+        self.published = 0
+        self.read_frames = 0
+        self.dropped = 0  # published but replaced before anyone read them
+
+    @property
+    def pending(self) -> bool:
+        """A published frame is waiting for the reader (the display is behind)."""
+        return self._fresh
+
+    @property
+    def capacity(self) -> int:
+        return len(self._frames[0].data)
+
+    def back(self) -> Frame:
+        """Frame for the writer to fill (owned by the writer until `publish()`)."""
+        return self._frames[self._back]
+
+    def publish(self, t: TimeAxis, n: int, channels: tuple | None = None) -> bool:
+        """Make the back frame (its first `n` samples over the axis `t`, or `n` samples of
+        each of the `channels` of a batched frame) the latest one.
+        Returns True when the reader had already taken the previous frame, i.e. when it
+        needs to be notified (otherwise a notification is still pending)."""
+        with self._lock:
+            frame = self._frames[self._back]
+            self.published += 1
+            frame.sequence, frame.t, frame.n, frame.channels = self.published, t, int(n), channels
+            self._back, self._latest = self._latest, self._back
+            if self._fresh:
+                self.dropped += 1
+            notify = not self._fresh
+            self._fresh = True
+        return notify
+
+    def read(self) -> Frame | None:
+        """Take the latest complete frame (owned by the reader until the next `read()`),
+        None if nothing new was published since the previous call."""
+        with self._lock:
+            if not self._fresh:
+                return None
+            self._front, self._latest = self._latest, self._front
+            self._fresh = False
+            self.read_frames += 1
+            return self._frames[self._front]
+
+    def stats(self) -> dict[str, int]:
+        return {"published": self.published, "read": self.read_frames, "dropped": self.dropped}
+
+
+if __name__ == "__main__":
+    import time
+
+    exchange = TripleBuffer(1_000_000)
+    stop = threading.Event()
+
+    def writer():
+        while not stop.is_set():
+            frame = exchange.back()
+            frame.data.fill(exchange.published + 1)  # every sample carries the sequence
+            exchange.publish(TimeAxis(0.0, 1e-9, 1_000_000), 1_000_000)
+
+    thread = threading.Thread(target=writer)
+    thread.start()
+    torn = 0
+    for _ in range(200):
+        frame = exchange.read()
+        if frame is not None:
+            torn += int(frame.wfm[0] != frame.sequence or frame.wfm[-1] != frame.sequence)
+        time.sleep(0.005)
+    stop.set()
+    thread.join()
+    print(f"{exchange.stats()}, torn frames: {torn}")
@@ -0,0 +1,84 @@
+"""Measured generation latency and the knob debounce derived from it.
+
+A fixed debounce is tuned for one machine: too long on a fast one (sluggish
+knobs), too short on a slow one (every knob step starts a regeneration that
+is aborted by the next one). The `LatencyTracker` keeps a moving average of
+the time a full acquisition takes per (waveform, memory depth, timebase) and
+derives from it how long a knob has to rest before the full acquisitions
+resume (debounce) and how often previews are shown while it turns
+(coalescing window)."""
+
+from decimal import Decimal
+import threading
+
+DEBOUNCE_FACTOR = 2.0  # debounce in units of the expected acquisition latency
+MIN_DEBOUNCE = 0.02  # s
+MAX_DEBOUNCE = 0.5  # s
+DEFAULT_DEBOUNCE = 0.1  # s, before anything was measured
+MIN_COALESCING_WINDOW = 1 / 60  # s, previews are not shown faster than the display refreshes
+SMOOTHING = 0.3  # weight of a new measurement in the moving average
+
+
+class LatencyTracker:
+    """Exponential moving averages of the acquisition latency.
+
+    Keys never measured are estimated from the latency per sample of the same
+    waveform, which dominates as long as the work scales with the points."""
+
+    def __init__(self, smoothing: float = SMOOTHING):
+        self.smoothing = smoothing
+        self._latency: dict[tuple, float] = {}  # (waveform, memory depth, timebase) -> s
+        self._per_sample: dict[str, float] = {}  # waveform -> s per sample
+        self._preview: dict[str, float] = {}  # waveform -> s per preview
+        self._lock = threading.Lock()  # written by the pool workers, read by the GUI thread
+
+    @staticmethod
+    def _key(waveform: str, memory_depth: int, timebase) -> tuple:
+        return (waveform, int(memory_depth), Decimal(str(timebase)))
+
+    def _average(self, table: dict, key, value: float):
+        previous = table.get(key)
+        table[key] = value if previous is None else previous + self.smoothing * (value - previous)
+
+    def record(self, waveform: str, memory_depth: int, timebase, points: int, seconds: float):
+        """Measured time of a full acquisition of `points` samples."""
+        with self._lock:
+            self._average(self._latency, self._key(waveform, memory_depth, timebase), seconds)
+            self._average(self._per_sample, waveform, seconds / max(1, points))
+
+    def record_preview(self, waveform: str, seconds: float):
+        with self._lock:
+            self._average(self._preview, waveform, seconds)
+
+    def estimate(self, waveform: str, memory_depth: int, timebase, points: int) -> float | None:
+        """Expected time of a full acquisition [s], None when nothing is known yet."""
+        with self._lock:
+            latency = self._latency.get(self._key(waveform, memory_depth, timebase))
+            if latency is None and waveform in self._per_sample:
+                latency = self._per_sample[waveform] * points
+        return latency
+
+    def debounce(self, waveform: str, memory_depth: int, timebase, points: int) -> float:
+        """How long a knob has to rest before the full acquisitions resume [s]."""
+        latency = self.estimate(waveform, memory_depth, timebase, points)
+        if latency is None:
+            return DEFAULT_DEBOUNCE
+        return min(max(DEBOUNCE_FACTOR * latency, MIN_DEBOUNCE), MAX_DEBOUNCE)
+
+    def coalescing_window(self, waveform: str) -> float:
+        """Shortest interval between two previews while a knob turns [s]; the knob events
+        arriving in between are merged into the next preview."""
+        with self._lock:
+            preview = self._preview.get(waveform, 0.0)
+        return max(preview, MIN_COALESCING_WINDOW)
+
+
+_latency_tracker: LatencyTracker | None = None
+
+
+def get_latency_tracker() -> LatencyTracker:
+    """Process-wide latency measurements shared by the generators (created on first use)."""
+    global _latency_tracker
+    if _latency_tracker is None:
+        _latency_tracker = LatencyTracker()
+    return _latency_tracker
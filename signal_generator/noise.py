@@ -0,0 +1,203 @@
+"""Precomputed gaussian noise for the acquisitions.
+
+Drawing 14M normal samples for every frame dominates the idle loop of the
+generators. The `NoiseBank` draws a large unit-variance pool once, and every
+frame takes a window of it at a random offset and stride, scaled by the
+requested standard deviation. Taking noise is therefore a copy (or a view),
+not a gaussian generation."""
+
+from concurrent.futures import ThreadPoolExecutor
+import logging
+import os
+import threading
+
+import numpy as np
+from numpy.typing import NDArray
+
+DEFAULT_POOL_SIZE = 1 << 22  # samples (16 MB of float32)
+DEFAULT_MEMORY_CAP = 64 * 2**20  # bytes
+STRIDES = (1, 2, 3, 5, 7)  # coprime strides so that windows rarely repeat
+WINDOW_FRACTION = 8  # fills take windows of at most 1/8 of the pool (each at its own offset)
+PARALLEL_THRESHOLD = 1 << 20  # samples below which threads are not worth it
+
+
+class ParallelGaussianFiller:
+    """Fill large float32 buffers with gaussian noise using a pool of threads.
+
+    Every worker owns a generator seeded by a child of `seed_sequence`
+    (`SeedSequence.spawn`), so the streams are independent and, for a given
+    seed and number of workers, reproducible."""
+
+    def __init__(self, seed_sequence: np.random.SeedSequence | None = None, workers: int | None = None):
+        self.workers = max(1, workers if workers is not None else (os.cpu_count() or 1))
+        self.seed_sequence = seed_sequence if seed_sequence is not None else np.random.SeedSequence()
+        self.generators = [np.random.default_rng(child) for child in self.seed_sequence.spawn(self.workers)]
+        self._executor = (
+            ThreadPoolExecutor(max_workers=self.workers, thread_name_prefix="noise")
+            if self.workers > 1
+            else None
+        )
+
+    def fill(self, out: NDArray, std_dev: float = 1.0) -> NDArray:
+        """Fill `out` (float32) in place, splitting it in one chunk per worker."""
+        n = len(out)
+        if self._executor is None or n < PARALLEL_THRESHOLD:
+            self._fill_chunk(self.generators[0], out, std_dev)
+            return out
+
+        bounds = np.linspace(0, n, self.workers + 1, dtype=np.int64)
+        futures = [
+            self._executor.submit(self._fill_chunk, rng, out[start:stop], std_dev)
+            for rng, start, stop in zip(self.generators, bounds[:-1], bounds[1:])
+        ]
+        for future in futures:
+            future.result()
+        return out
+
+    @staticmethod
+    def _fill_chunk(rng: np.random.Generator, chunk: NDArray, std_dev: float):
+        rng.standard_normal(dtype=np.float32, out=chunk)
+        if std_dev != 1:
+            np.multiply(chunk, std_dev, out=chunk)
+
+    def shutdown(self):
+        if self._executor is not None:
+            self._executor.shutdown(wait=False)
+
+
+class NoiseBank:
+    """Pool of float32 samples of the standard normal distribution.
+
+    Parameters:
+      pool_size (int): Number of samples in the pool.
+      memory_cap (int): Upper limit of the pool size in bytes.
+      refresh_fraction (float): Fraction of the pool regenerated on every frame
+                                (cheap re-randomisation, 0 disables it).
+      rng (np.random.Generator): Source of the pool samples and of the window positions.
+      filler (ParallelGaussianFiller): Fills the pool in parallel instead of `rng`.
+    """
+
+    def __init__(
+        self,
+        pool_size: int = DEFAULT_POOL_SIZE,
+        memory_cap: int = DEFAULT_MEMORY_CAP,
+        refresh_fraction: float = 0.01,
+        rng: np.random.Generator | None = None,
+        filler: ParallelGaussianFiller | None = None,
+    ):
+        max_size = int(memory_cap) // np.dtype(np.float32).itemsize
+        if pool_size > max_size:
+            logging.info(f"Noise pool of {pool_size} samples exceeds the memory cap. Using {max_size} samples.")
+            pool_size = max_size
+        if pool_size < 1:
+            raise ValueError("Noise pool must hold at least one sample.")
+
+        self.rng = rng if rng is not None else np.random.default_rng()
+        self.refresh_fraction = float(refresh_fraction)
+        if filler is not None:
+            self.pool = filler.fill(np.empty(int(pool_size), dtype=np.float32))
+        else:
+            self.pool = self.rng.standard_normal(int(pool_size), dtype=np.float32)
+
+    @property
+    def pool_size(self) -> int:
+        return len(self.pool)
+
+    @property
+    def nbytes(self) -> int:
+        return self.pool.nbytes
+
+    def window(self, n: int) -> NDArray:
+        """Return a read-only view of `n` unit-variance samples at a random offset and stride.
+        Windows longer than the pool are not possible, use `fill()` for these."""
+        if n > self.pool_size:
+            raise ValueError(f"Window of {n} samples does not fit the pool of {self.pool_size}.")
+        strides = [s for s in STRIDES if (n - 1) * s < self.pool_size]
+        stride = strides[self.rng.integers(len(strides))]
+        offset = int(self.rng.integers(self.pool_size - (n - 1) * stride))
+        view = self.pool[offset : offset + (n - 1) * stride + 1 : stride]
+        view.flags.writeable = False
+        return view
+
+    def fill(self, out: NDArray, std_dev: float = 1.0, refresh: bool = True) -> NDArray:
+        """Fill `out` with noise of the given standard deviation. Long buffers are filled
+        window by window, every window of at most 1/WINDOW_FRACTION of the pool at its own
+        random offset, stride and sign, so a fill longer than the pool is not periodic.
+        Pass `refresh=False` when filling a frame block by block and call `refresh()` once
+        per frame instead."""
+        n = len(out)
+        chunk = min(n, max(1, self.pool_size // WINDOW_FRACTION))
+        for start in range(0, n, chunk):
+            stop = min(start + chunk, n)
+            # A random sign flips the window for free and doubles the distinct windows
+            scale = std_dev if self.rng.integers(2) else -std_dev
+            np.multiply(self.window(stop - start), scale, out=out[start:stop])
+
+        if refresh:
+            self.refresh()
+        return out
+
+    def refresh(self, fraction: float | None = None):
+        """Regenerate a random contiguous part of the pool (`refresh_fraction` by default)."""
+        fraction = self.refresh_fraction if fraction is None else fraction
+        m = int(self.pool_size * fraction)
+        if not m:
+            return
+        offset = int(self.rng.integers(self.pool_size - m + 1))
+        self.rng.standard_normal(dtype=np.float32, out=self.pool[offset : offset + m])
+
+
+def make_noise_bank(seed_sequence: np.random.SeedSequence | None = None, **kwargs) -> NoiseBank:
+    """`NoiseBank` seeded by `seed_sequence`, its pool filled by a `ParallelGaussianFiller`
+    whose threads are released right after (the pool is filled only once)."""
+    seed_sequence = seed_sequence if seed_sequence is not None else np.random.SeedSequence()
+    bank_seed, filler_seed = seed_sequence.spawn(2)
+    filler = ParallelGaussianFiller(filler_seed)
+    try:
+        return NoiseBank(rng=np.random.default_rng(bank_seed), filler=filler, **kwargs)
+    finally:
+        filler.shutdown()
+
+
+_noise_bank: NoiseBank | None = None
+_noise_bank_lock = threading.Lock()  # the generators of several channels start concurrently
+
+
+def get_noise_bank() -> NoiseBank:
+    """Process-wide noise bank shared by the generators (created on first use)."""
+    global _noise_bank
+    with _noise_bank_lock:
+        if _noise_bank is None:
+            _noise_bank = make_noise_bank()
+        return _noise_bank
+
+
+if __name__ == "__main__":
+    import time
+
+    n = 14_000_000
+    out = np.empty(n, dtype=np.float32)
+    rng = np.random.default_rng()
+
+    tic = time.perf_counter()
+    rng.normal(loc=0.0, scale=0.01, size=n).astype(np.float32)
+    toc = time.perf_counter()
+    print(f"rng.normal + astype: {(toc - tic) * 1e3:.1f} ms")
+
+    tic = time.perf_counter()
+    rng.standard_normal(dtype=np.float32, out=out)
+    toc = time.perf_counter()
+    print(f"rng.standard_normal(dtype=float32, out=): {(toc - tic) * 1e3:.1f} ms")
+
+    filler = ParallelGaussianFiller(np.random.SeedSequence(1234))
+    tic = time.perf_counter()
+    filler.fill(out, 0.01)
+    toc = time.perf_counter()
+    print(f"ParallelGaussianFiller.fill ({filler.workers} workers): {(toc - tic) * 1e3:.1f} ms")
+    filler.shutdown()
+
+    bank = NoiseBank()
+    tic = time.perf_counter()
+    bank.fill(out, 0.01)
+    toc = time.perf_counter()
+    print(f"NoiseBank.fill: {(toc - tic) * 1e3:.1f} ms (std = {out.std():.5f})")
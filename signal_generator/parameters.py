@@ -0,0 +1,78 @@
+"""Versioned, immutable acquisition parameters of a generator.
+
+The knob slots run in the GUI thread while the generator acquires in a pool
+worker. Instead of mutating attributes the worker reads at the same time,
+the GUI publishes a new frozen `AcquisitionParameters` snapshot with one
+reference swap, and the worker always acquires with one consistent
+snapshot. The version tells the worker whether anything changed, the data
+derived from a snapshot (points, time axis) is computed once per snapshot,
+and equal settings compare and hash equal whatever their version, so they
+can key caches of grids or filters."""
+
+from dataclasses import dataclass, field, replace
+from decimal import Decimal
+from functools import cached_property
+import threading
+
+from signal_generator.time_axis import TimeAxis
+from systems.horizontal_system.horizontal_functions import get_acquired_points
+
+
+@dataclass(frozen=True)
+class AcquisitionParameters:
+    timebase: Decimal
+    trigger_delay: Decimal
+    connector_state: bool
+    memory_depth: int  # samples of the channel at the slowest timebases
+    version: int = field(default=0, compare=False)  # 0, 1, ... in the order of publishing
+
+    @property
+    def window(self) -> tuple[Decimal, Decimal]:
+        """What is on the screen: a change of it asks for a preview."""
+        return self.timebase, self.trigger_delay
+
+    @cached_property
+    def points(self) -> int:
+        """Points acquired at the real sample rate (capped at the ADC rate)."""
+        return get_acquired_points(self.timebase, self.memory_depth)
+
+    @cached_property
+    def time_axis(self) -> TimeAxis:
+        return TimeAxis.from_timebase(self.timebase, self.points, self.trigger_delay)
+
+
+@dataclass(frozen=True)
+class BatchParameters(AcquisitionParameters):
+    """Parameters of a batch of channels acquired together over one time axis. The memory
+    depth is divided between the channels of the batch."""
+
+    channels: tuple[int, ...] = ()  # channel of every row
+    connector_states: tuple[bool, ...] = ()  # per channel (`connector_state` is unused)
+
+    @cached_property
+    def points(self) -> int:
+        return get_acquired_points(self.timebase, self.memory_depth // max(1, len(self.channels)))
+
+
+class ParameterStore:
+    """Holder of the current snapshot. Publishing replaces it atomically (one reference
+    swap), readers take `current` once and keep using that snapshot."""
+
+    def __init__(self, initial: AcquisitionParameters):
+        self._current = initial
+        self._lock = threading.Lock()  # orders concurrent writers, readers need no lock
+
+    @property
+    def current(self) -> AcquisitionParameters:
+        return self._current
+
+    @property
+    def version(self) -> int:
+        return self._current.version
+
+    def update(self, **changes) -> AcquisitionParameters:
+        """Publish a copy of the current snapshot with `changes` under the next version."""
+        with self._lock:
+            snapshot = replace(self._current, version=self._current.version + 1, **changes)
+            self._current = snapshot
+        return snapshot
@@ -0,0 +1,208 @@
+"""Cost-model based choice of the pulse train generation strategy.
+
+Which way of placing the pulses in memory is fastest depends on the number of
+pulses, the width of one pulse in samples and the memory depth. The planner
+estimates the cost of every strategy from a small linear model whose
+coefficients are measured once by a micro-benchmark (on first use) and cached
+on disk next to the settings. The generators of several channels share the
+planner: it is created and calibrated under a lock, and the cache file is
+replaced atomically.
+
+Strategies:
+  * "loop":        add the pulse shape pulse by pulse (slices).
+  * "scatter":     add every sample of the pulse shape to all pulses at once.
+  * "fft":         convolve an impulse train with the pulse shape (FFT).
+  * "overlap_add": the same convolution by overlap-add (FFT of short blocks).
+  * "tiling":      broadcast one period into memory (exactly periodic pulses only).
+"""
+
+import json
+import logging
+import os
+import platform
+import tempfile
+import threading
+import time
+
+import numpy as np
+from scipy import signal
+
+CACHE_PATH = os.path.join("settings", "pulse_train_costs.json")
+CALIBRATION_VERSION = 2
+COEFFICIENTS = {
+    "per_call",
+    "per_slice_sample",
+    "per_fancy_sample",
+    "per_fft_sample",
+    "per_oa_sample",
+    "per_copy_sample",
+    "per_fill_sample",
+    "per_impulse",
+}
+
+pulse_train_strategies = ["loop", "scatter", "fft", "overlap_add", "tiling"]
+
+
+def _best_of(func, repeat: int = 3) -> float:
+    """Shortest wall time of `func()` in seconds."""
+    best = float("inf")
+    for _ in range(repeat):
+        tic = time.perf_counter()
+        func()
+        best = min(best, time.perf_counter() - tic)
+    return best
+
+
+def _machine_key() -> str:
+    return f"{platform.node()}|{platform.machine()}|{os.cpu_count()}|numpy {np.__version__}"
+
+
+class PulseTrainPlanner:
+    """Estimate the cost of every pulse train strategy and pick the cheapest one.
+
+    Given `coefficients`, the planner uses them as they are (no calibration, no cache)."""
+
+    def __init__(self, cache_path: str | None = CACHE_PATH, coefficients: dict[str, float] | None = None):
+        self.cache_path = cache_path
+        self._coefficients: dict[str, float] | None = dict(coefficients) if coefficients is not None else None
+        self._lock = threading.Lock()  # one calibration at a time
+
+    @property
+    def coefficients(self) -> dict[str, float]:
+        if self._coefficients is None:
+            with self._lock:
+                if self._coefficients is None:  # not calibrated by another thread meanwhile
+                    self._coefficients = self._load() or self._calibrate()
+        return self._coefficients
+
+    def estimate(self, num_pulses: int, window: int, mem_depth: int, periodic: bool = False) -> dict[str, float]:
+        """Estimated time [s] of every strategy for `num_pulses` pulses of `window` samples
+        in `mem_depth` samples of memory."""
+        c = self.coefficients
+        n = max(int(mem_depth), 2)
+        log_n = np.log2(n)
+        estimates = {
+            "loop": num_pulses * (c["per_call"] + window * c["per_slice_sample"]),
+            "scatter": window * (c["per_call"] + num_pulses * c["per_fancy_sample"]),
+            # The convolutions also clear the impulse buffer and scatter one impulse per pulse
+            "fft": n * c["per_fill_sample"] + num_pulses * c["per_impulse"] + n * log_n * c["per_fft_sample"],
+            "overlap_add": n * c["per_fill_sample"]
+            + num_pulses * c["per_impulse"]
+            + n * np.log2(max(window, 2)) * c["per_oa_sample"]
+            + n * c["per_copy_sample"],
+            "tiling": n * c["per_copy_sample"] if periodic else float("inf"),
+        }
+        return estimates
+
+    def choose(self, num_pulses: int, window: int, mem_depth: int, periodic: bool = False) -> str:
+        estimates = self.estimate(num_pulses, window, mem_depth, periodic)
+        strategy = min(estimates, key=estimates.get)  # type: ignore
+        logging.debug(f"Pulse train strategy {strategy} from estimates {estimates}")
+        return strategy
+
+    def calibrate(self) -> dict[str, float]:
+        """Measure the model coefficients with small micro-benchmarks (~0.1 s) and cache them."""
+        with self._lock:
+            return self._calibrate()
+
+    def _calibrate(self) -> dict[str, float]:
+        n = 1 << 18
+        train = np.zeros(n, dtype=np.float32)
+        narrow = np.ones(3, dtype=np.float32)
+        wide = np.ones(2001, dtype=np.float32)
+
+        def add_pulse_by_pulse(centers, shape):
+            for center in centers:
+                train[center : center + len(shape)] += shape
+
+        def add_sample_by_sample(centers, shape):
+            for k in range(len(shape)):
+                train[centers + k] += shape[k]
+
+        # Pulse by pulse: fixed cost per pulse and cost per added sample
+        centers = np.linspace(0, n - 3, 2000).astype(np.int64)
+        per_call = _best_of(lambda: add_pulse_by_pulse(centers, narrow)) / len(centers)
+        centers = np.linspace(0, n - len(wide), 100).astype(np.int64)
+        wide_loop = _best_of(lambda: add_pulse_by_pulse(centers, wide)) / len(centers)
+        per_slice_sample = max(wide_loop - per_call, 0) / len(wide)
+
+        # Sample by sample of the pulse shape: cost per scattered sample
+        centers = np.linspace(0, n - 3, 20_000).astype(np.int64)
+        scatter = _best_of(lambda: add_sample_by_sample(centers, narrow)) / len(narrow)
+        per_fancy_sample = max(scatter - per_call, 0) / len(centers)
+
+        # Convolutions: impulse train (clear the buffer, scatter one impulse per pulse) and transform
+        impulses = np.zeros(n, dtype=np.float32)
+        per_fill_sample = _best_of(lambda: impulses.fill(0)) / n
+        per_impulse = _best_of(lambda: np.add.at(impulses, centers, 1)) / len(centers)
+        impulses.fill(0)
+        impulses[centers] = 1
+        kernel = np.ones(101, dtype=np.float32)
+        per_fft_sample = _best_of(lambda: signal.fftconvolve(impulses, kernel, mode="same")) / (n * np.log2(n))
+        per_oa_sample = _best_of(lambda: signal.oaconvolve(impulses, kernel, mode="same")) / (n * np.log2(len(kernel)))
+        per_copy_sample = _best_of(lambda: np.copyto(train, impulses)) / n
+
+        self._coefficients = {
+            "per_call": per_call,
+            "per_slice_sample": per_slice_sample,
+            "per_fancy_sample": per_fancy_sample,
+            "per_fft_sample": per_fft_sample,
+            "per_oa_sample": per_oa_sample,
+            "per_copy_sample": per_copy_sample,
+            "per_fill_sample": per_fill_sample,
+            "per_impulse": per_impulse,
+        }
+        self._save(self._coefficients)
+        return self._coefficients
+
+    def _load(self) -> dict[str, float] | None:
+        if not self.cache_path or not os.path.exists(self.cache_path):
+            return None
+        try:
+            with open(self.cache_path, "r") as file:
+                cache = json.load(file)
+        except (OSError, ValueError):
+            logging.info("Unreadable pulse train cost cache. Recalibrating.")
+            return None
+        if cache.get("version") != CALIBRATION_VERSION or cache.get("machine") != _machine_key():
+            return None
+        coefficients = cache.get("coefficients")
+        if not isinstance(coefficients, dict) or not COEFFICIENTS.issubset(coefficients):
+            logging.info("Incomplete pulse train cost cache. Recalibrating.")
+            return None
+        return coefficients
+
+    def _save(self, coefficients: dict[str, float]):
+        """Write the cache to a temporary file and move it over the cache file, so that a
+        reader (another process) never sees a partly written one."""
+        if not self.cache_path:
+            return
+        try:
+            fd, temp_path = tempfile.mkstemp(suffix=".tmp", dir=os.path.dirname(self.cache_path) or ".")
+        except OSError:
+            logging.info(f"Could not cache pulse train costs in {self.cache_path}.")
+            return
+        try:
+            with os.fdopen(fd, "w") as file:
+                json.dump(
+                    {"version": CALIBRATION_VERSION, "machine": _machine_key(), "coefficients": coefficients},
+                    file,
+                    indent=4,
+                )
+            os.replace(temp_path, self.cache_path)
+        except OSError:
+            logging.info(f"Could not cache pulse train costs in {self.cache_path}.")
+            os.remove(temp_path)
+
+
+_planner: PulseTrainPlanner | None = None
+_planner_lock = threading.Lock()  # the pool workers ask for the planner concurrently
+
+
+def get_planner() -> PulseTrainPlanner:
+    """Process-wide planner (calibrated or loaded from the cache on first use)."""
+    global _planner
+    with _planner_lock:
+        if _planner is None:
+            _planner = PulseTrainPlanner()
+        return _planner
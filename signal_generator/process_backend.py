@@ -0,0 +1,211 @@
+"""Signal generation in worker processes (optional backend).
+
+With the thread backend every `SignalGenerator` runs in a `QThread`, so its
+noise generation and Python loop compete with the Qt GUI thread for the GIL.
+With this backend the `StreamingSynthesizer` of a channel runs in a worker
+process that writes every acquisition into a ring of frames in
+`multiprocessing.shared_memory`. The GUI side only receives small
+(slot, sequence, t0, dt, n) notifications and copies the frame out of the
+ring before handing it to the display (the worker reuses the slot), nothing
+of the size of the memory depth is pickled.
+
+The module does not import Qt, so that the worker processes stay light."""
+
+from decimal import Decimal
+import logging
+import multiprocessing as mp
+from multiprocessing import shared_memory
+import queue
+
+import numpy as np
+from numpy.typing import NDArray
+
+from signal_generator.noise import NoiseBank
+from signal_generator.streaming import StreamingSynthesizer
+from signal_generator.time_axis import TimeAxis
+from systems.horizontal_system.horizontal_functions import get_acquired_points
+
+FRAME_SLOTS = 3
+POLL_INTERVAL = 0.1  # s, how often blocked loops check for the stop request
+
+
+class SharedFrameRing:
+    """Ring of `slots` float32 frames of `capacity` samples in one shared memory block.
+
+    The creating side (name=None) owns the block and unlinks it on `close()`,
+    the other side attaches to an existing block by its name."""
+
+    def __init__(self, capacity: int, slots: int = FRAME_SLOTS, name: str | None = None):
+        self.capacity = int(capacity)
+        self.slots = int(slots)
+        self._owner = name is None
+        nbytes = self.slots * self.capacity * np.dtype(np.float32).itemsize
+        self.shm = shared_memory.SharedMemory(name=name, create=self._owner, size=nbytes if self._owner else 0)
+        self.frames: NDArray | None = np.ndarray((self.slots, self.capacity), dtype=np.float32, buffer=self.shm.buf)
+
+    @property
+    def name(self) -> str:
+        return self.shm.name
+
+    def frame(self, slot: int, n: int) -> NDArray:
+        """View of the first `n` samples of the frame in `slot` (no copy)."""
+        return self.frames[slot, :n]  # type: ignore
+
+    def close(self):
+        self.frames = None
+        try:
+            self.shm.close()
+        except BufferError:
+            # A view of a frame is still referenced (e.g. by the plot), the mapping goes with it
+            logging.debug("Shared frame ring still in use, leaving the mapping to the garbage collector.")
+        if self._owner:
+            try:
+                self.shm.unlink()
+            except FileNotFoundError:
+                pass
+
+
+def _generator_process(ring_name, capacity, slots, config, seed, commands, notifications, stop_event):
+    """Worker process: acquire frames into the shared ring until `stop_event` is set.
+
+    Commands are (name, value) tuples for "timebase", "trigger_delay",
+    "connector_state" and "hold"; only the latest value of each matters. While
+    held, the worker acquires nothing and only waits for commands. A notification
+    is put after a frame is complete, the bounded queue throttles the worker
+    to the pace of the GUI."""
+    ring = SharedFrameRing(capacity, slots, name=ring_name)
+    noise_bank = NoiseBank(rng=np.random.default_rng(seed))
+    synthesizer = StreamingSynthesizer(noise_bank=noise_bank, **config["synthesizer"])
+    state = {
+        "timebase": config["timebase"],
+        "trigger_delay": config["trigger_delay"],
+        "connector_state": config["connector_state"],
+        "hold": False,
+    }
+
+    slot = 0
+    sequence = 0
+    while not stop_event.is_set():
+        # Apply the knob changes that arrived since the previous frame
+        try:
+            while True:
+                name, value = commands.get_nowait()
+                state[name] = value
+        except queue.Empty:
+            pass
+        if state["hold"]:
+            try:
+                name, value = commands.get(timeout=POLL_INTERVAL)
+                state[name] = value
+            except queue.Empty:
+                pass
+            continue
+
+        points = get_acquired_points(state["timebase"], capacity)
+        t = TimeAxis.from_timebase(state["timebase"], points, state["trigger_delay"])
+        synthesizer.acquire(ring.frame(slot, points), t.t0, t.dt, connector_state=state["connector_state"])
+        sequence += 1
+
+        notification = (slot, sequence, t.t0, t.dt, points)
+        while not stop_event.is_set():
+            try:
+                notifications.put(notification, timeout=POLL_INTERVAL)
+                break
+            except queue.Full:
+                continue
+        slot = (slot + 1) % slots
+
+    ring.close()
+
+
+class GeneratorProcess:
+    """Owner of the worker process, its shared frame ring and its queues (GUI side).
+
+    Parameters:
+      capacity (int): Samples per frame (the memory depth of the channel).
+      timebase, trigger_delay, connector_state: Initial acquisition state.
+      seed: Entropy of the noise of the worker (None for fresh entropy).
+      synthesizer_kwargs: Passed to the `StreamingSynthesizer` of the worker.
+    """
+
+    def __init__(
+        self,
+        capacity: int,
+        timebase: Decimal,
+        trigger_delay: Decimal = Decimal(0),
+        connector_state: bool = True,
+        slots: int = FRAME_SLOTS,
+        seed=None,
+        **synthesizer_kwargs,
+    ):
+        # "spawn" does not inherit the state of the Qt threads of the GUI process
+        context = mp.get_context("spawn")
+        self.ring = SharedFrameRing(capacity, slots)
+        self.commands = context.Queue()
+        # One pending notification at most: the worker never gets more than a frame ahead
+        # of the reader, so the slot being read is not overwritten by the next one
+        self.notifications = context.Queue(maxsize=max(1, slots - 2))
+        self.stop_event = context.Event()
+        config = {
+            "timebase": timebase,
+            "trigger_delay": trigger_delay,
+            "connector_state": connector_state,
+            "synthesizer": synthesizer_kwargs,
+        }
+        self.process = context.Process(
+            target=_generator_process,
+            args=(
+                self.ring.name,
+                capacity,
+                slots,
+                config,
+                np.random.SeedSequence(seed).entropy,
+                self.commands,
+                self.notifications,
+                self.stop_event,
+            ),
+            daemon=True,
+        )
+
+    def start(self):
+        self.process.start()
+
+    def send(self, name: str, value):
+        """Forward a change of "timebase", "trigger_delay", "connector_state" or "hold" to the worker."""
+        self.commands.put((name, value))
+
+    def next_frame(self, timeout: float = POLL_INTERVAL) -> tuple[int, TimeAxis, NDArray] | None:
+        """(sequence, time axis, frame view) of the next complete frame, None on timeout."""
+        try:
+            slot, sequence, t0, dt, n = self.notifications.get(timeout=timeout)
+        except queue.Empty:
+            return None
+        return sequence, TimeAxis(t0, dt, n), self.ring.frame(slot, n)
+
+    def stop(self, timeout: float = 1.0):
+        self.stop_event.set()
+        if self.process.is_alive():
+            self.process.join(timeout)
+        if self.process.is_alive():
+            logging.info("Signal generator process did not stop in time. Terminating it.")
+            self.process.terminate()
+        self.ring.close()
+
+
+if __name__ == "__main__":
+    import time
+
+    generator = GeneratorProcess(
+        14_000_000, Decimal("1E-3"), waveform="sine", freq=50e6, noise_std_dev=0.01, dds=True
+    )
+    generator.start()
+    tic = time.perf_counter()
+    frames = 0
+    while frames < 20:
+        frame = generator.next_frame(timeout=10)
+        if frame is not None:
+            frames += 1
+    toc = time.perf_counter()
+    sequence, t, wfm = frame  # type: ignore
+    print(f"{frames} frames of {len(t)} points in {toc - tic:.2f} s (last sequence {sequence}, std {wfm.std():.3f})")
+    generator.stop()
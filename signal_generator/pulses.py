@@ -0,0 +1,152 @@
+"""Pulse shape of the pulse trains and the ways of adding it into memory.
+
+A pulse is a skewed gaussian that spans about ±5 pulse widths. Rather than
+evaluating `exp` and `erf` at every sample, the shape is sampled once per
+sample interval and added at the (rounded) index of every pulse center,
+by the strategy the planner estimates to be the cheapest (see
+`signal_generator.planner`). Where the position of the pulses within a
+sample matters, a table of the shape shifted by fractions of a sample is
+sampled instead and every pulse takes the row of its fraction. The module
+does not import Qt, so that the worker processes can use it."""
+
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import NDArray
+from scipy.special import erf
+
+_dtype = np.float32
+PULSE_PHASES = 16  # sub-sample positions of the pulse shape table (1/16 sample resolution)
+
+
+def pulse_shape(dt_from_center: NDArray, pulse_width: float) -> NDArray:
+    """Skewed gaussian at the times `dt_from_center` from the pulse center."""
+    return np.exp(-(dt_from_center**2) / (2 * pulse_width**2)) * (
+        1 + erf(4.5 * dt_from_center / (np.sqrt(2) * pulse_width))
+    )
+
+
+def pulse_peak(pulse_width: float) -> float:
+    """Peak of the pulse shape used to normalize the amplitude to 1."""
+    dt_local = np.linspace(-5 * pulse_width, 5 * pulse_width, 10_001)
+    return float(np.max(np.abs(pulse_shape(dt_local, pulse_width))))
+
+
+@lru_cache(maxsize=8)
+def sampled_pulse_shape(dt_sample, pulse_width) -> NDArray:
+    """Pulse shape sampled every `dt_sample` on ±5*pulse_width (read-only, cached:
+    it only changes with the timebase and the pulse width, not from frame to frame)."""
+    window_n = int(np.ceil(5 * pulse_width / dt_sample))
+
+    # Create a local time grid for one pulse
+    dt_local = np.linspace(-window_n * dt_sample, window_n * dt_sample, 2 * window_n + 1, dtype=_dtype)
+    shape = pulse_shape(dt_local, pulse_width)
+    shape.flags.writeable = False
+    return shape
+
+
+@lru_cache(maxsize=8)
+def sampled_pulse_table(dt_sample, pulse_width, phases: int = PULSE_PHASES) -> NDArray:
+    """(phases + 1, window) pulse shapes of a center `j / phases - 0.5` samples after the
+    middle sample of the window, j = 0..phases (read-only, cached as the sampled shape)."""
+    window_n = int(np.ceil(5 * pulse_width / dt_sample)) + 1  # room for the shift
+    offsets = np.arange(-window_n, window_n + 1, dtype=np.float64)
+    fractions = np.arange(phases + 1, dtype=np.float64)[:, None] / phases - 0.5
+    table = pulse_shape((offsets - fractions) * dt_sample, pulse_width).astype(_dtype)
+    table.flags.writeable = False
+    return table
+
+
+def phase_indices(positions: NDArray, centers: NDArray, rows: NDArray, phases: int = PULSE_PHASES):
+    """Split the fractional sample `positions` of the pulse centers into the sample of each
+    center (into `centers`) and the row of `sampled_pulse_table()` of its fraction (into `rows`).
+    `positions` is used as scratch."""
+    positions += 0.5
+    np.floor(positions, out=centers, casting="unsafe")
+    positions -= centers  # fraction + 0.5, in [0, 1)
+    positions *= phases
+    np.rint(positions, out=positions)
+    np.copyto(rows, positions, casting="unsafe")
+
+
+def scatter_pulses_loop(
+    pulse_train: NDArray, center_indices: NDArray, pulse_shape: NDArray, rows: NDArray | None = None
+) -> NDArray:
+    """Add `pulse_shape` centered at every index of `center_indices`, one pulse at a time.
+    With `rows`, `pulse_shape` is a table of shapes and pulse i is its row `rows[i]`.
+    Reference implementation of `scatter_pulses`."""
+    window_n = pulse_shape.shape[-1] // 2
+
+    for i, center_idx in enumerate(center_indices):
+        shape = pulse_shape if rows is None else pulse_shape[rows[i]]
+        # Determine the indices in t that will be updated by this pulse
+        idx_start = center_idx - window_n
+        idx_end = center_idx + window_n + 1  # +1 because slicing excludes the end
+
+        # Adjust in case the window goes out of bounds (pulse might not fit in the data)
+        valid_start = max(idx_start, 0)
+        valid_end = min(idx_end, len(pulse_train))
+        if valid_start >= valid_end:
+            continue
+
+        # Determine the corresponding slice in t of the precomputed pulse shape
+        pulse_shape_start = valid_start - idx_start
+        pulse_shape_end = pulse_shape_start + (valid_end - valid_start)
+
+        pulse_train[valid_start:valid_end] += shape[pulse_shape_start:pulse_shape_end]
+
+    return pulse_train
+
+
+def scatter_pulses(
+    pulse_train: NDArray, center_indices: NDArray, pulse_shape: NDArray, rows: NDArray | None = None
+) -> NDArray:
+    """Add `pulse_shape` centered at every index of (sorted) `center_indices` (the row
+    `rows[i]` of the table `pulse_shape` for pulse i when `rows` is given).
+
+    The Python loop runs over the samples of the pulse shape, scattering each one to
+    all pulses at once. Samples receive the contributions of the pulses in the same
+    order as in `scatter_pulses_loop`, so the result is bit-identical."""
+    n = len(pulse_train)
+    window_n = pulse_shape.shape[-1] // 2
+    center_indices = np.asarray(center_indices, dtype=np.int64)
+    # Pulses sharing a center index need an unbuffered scatter (np.add.at)
+    has_duplicates = bool(np.any(center_indices[1:] == center_indices[:-1]))
+    indices = np.empty_like(center_indices)
+
+    # Latest pulses first: later offsets into the shape belong to earlier pulses
+    for k in range(pulse_shape.shape[-1] - 1, -1, -1):
+        shift = k - window_n
+        # Pulses whose sample at this offset falls into the memory
+        first = np.searchsorted(center_indices, -shift, side="left")
+        last = np.searchsorted(center_indices, n - shift, side="left")
+        if first >= last:
+            continue
+        idx = indices[: last - first]
+        np.add(center_indices[first:last], shift, out=idx)
+        value = pulse_shape[k] if rows is None else pulse_shape[:, k][rows[first:last]]
+        if has_duplicates:
+            np.add.at(pulse_train, idx, value)
+        else:
+            pulse_train[idx] += value
+
+    return pulse_train
+
+
+def tile_pulses(pulse_train: NDArray, center_indices: NDArray, pulse_shape: NDArray) -> bool:
+    """Broadcast one period into memory when the pulses are exactly periodic in samples,
+    do not overlap and all fit in memory. Returns False (memory untouched) otherwise."""
+    if len(center_indices) < 2:
+        return False
+    period = int(center_indices[1] - center_indices[0])
+    if period < len(pulse_shape) or np.any(np.diff(center_indices) != period):
+        return False
+    start = int(center_indices[0]) - len(pulse_shape) // 2
+    stop = start + len(center_indices) * period
+    if start < 0 or stop > len(pulse_train):
+        return False
+
+    template = np.zeros(period, dtype=pulse_train.dtype)
+    template[: len(pulse_shape)] = pulse_shape
+    pulse_train[start:stop].reshape(-1, period)[:] = template
+    return True
@@ -0,0 +1,97 @@
+"""Pacing of the acquisition loop of a generator.
+
+A `SignalGenerator` would otherwise acquire as fast as it can, whether or not
+the display has taken the previous frame. The `AcquisitionScheduler` lets a
+frame through at most `target_rate` times per second, backs off (with an
+exponentially growing pause) while the display still has an unread frame,
+and idles without burning a core once the parameters have not changed for
+a while: the frames then only refresh the noise of an unchanged signal, a
+few of them per second are enough until the next change."""
+
+import threading
+import time
+from typing import Callable
+
+DEFAULT_WAVEFORM_RATE = 60  # waveforms per second (about the display refresh rate)
+MAX_BACKOFF = 0.25  # s, longest pause while the display is behind
+IDLE_POLL = 0.5  # s between the frames in idle mode (the generator is woken up on changes anyway)
+IDLE_AFTER = 5.0  # s without a change of the parameters before the idle mode
+
+
+class AcquisitionScheduler:
+    """Decide when the next frame is acquired.
+
+    Parameters:
+      target_rate (float): Waveforms per second, 0 or None for as fast as the display takes them.
+      max_backoff (float): Upper limit of the pause while the display is behind [s].
+      on_change (callable): Called by `notify_change()`, e.g. to wake up a pool that steps the generator.
+      idle_after (float): Time without a change after which a frame is acquired only every IDLE_POLL [s].
+    """
+
+    def __init__(
+        self,
+        target_rate: float | None = DEFAULT_WAVEFORM_RATE,
+        max_backoff: float = MAX_BACKOFF,
+        on_change: Callable[[], None] | None = None,
+        idle_after: float = IDLE_AFTER,
+    ):
+        self.target_rate = target_rate
+        self.max_backoff = max_backoff
+        self.on_change = on_change
+        self.idle_after = idle_after
+        self._wake = threading.Event()
+        self._last_change = time.perf_counter()
+        self._last_frame = float("-inf")
+        self._backoff = self.period
+
+        # COUNTERS
+        self.frames = 0
+        self.backpressure_waits = 0
+        self.idle_waits = 0
+
+    @property
+    def period(self) -> float:
+        return 1 / self.target_rate if self.target_rate else 0.0
+
+    def notify_change(self):
+        """Parameters changed (or the generator stops): end any wait and acquire again."""
+        self._last_change = time.perf_counter()
+        self._wake.set()
+        if self.on_change is not None:
+            self.on_change()
+
+    def sleep(self, timeout: float):
+        """Sleep up to `timeout` seconds, less if woken up by `notify_change()` (e.g. the
+        delay returned by `poll()`)."""
+        if timeout > 0 and self._wake.wait(timeout):
+            self._wake.clear()
+
+    def poll(self, display_behind: bool = False, continuous: bool = False) -> float:
+        """0 when a frame has to be acquired now, otherwise the number of seconds to wait
+        (see `sleep()`) before asking again.
+
+        `display_behind`: the previous frame was not taken by the display yet.
+        `continuous`: every acquisition counts (e.g. into the persistence display), no idling."""
+        now = time.perf_counter()
+        idle = not continuous and now - self._last_change >= self.idle_after
+        period = max(self.period, IDLE_POLL) if idle else self.period
+        due = self._last_frame + period
+        if now < due:
+            if idle:
+                self.idle_waits += 1
+            return due - now  # check the state again when due (or when woken up by a change)
+
+        if display_behind:
+            # Adaptive backpressure: pause longer the longer the display stays behind
+            self.backpressure_waits += 1
+            backoff = self._backoff
+            self._backoff = min(max(2 * self._backoff, 1e-3), self.max_backoff)
+            return max(backoff, 1e-3)
+        self._backoff = self.period
+
+        self._last_frame = time.perf_counter()
+        self.frames += 1
+        return 0.0
+
+    def stats(self) -> dict[str, int]:
+        return {"frames": self.frames, "backpressure_waits": self.backpressure_waits, "idle_waits": self.idle_waits}
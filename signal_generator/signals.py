@@ -1,5 +1,5 @@
-from collections import deque
 from decimal import Decimal
+from functools import lru_cache, partial
 import logging
 import time
 import wave
@@ -8,26 +8,43 @@ import numpy as np
 from numpy.typing import NDArray
 import matplotlib.pyplot as plt
 from scipy import signal
-from scipy.special import erf
-from PyQt5.QtCore import QObject, pyqtSignal, QThread, QTimer, pyqtSlot
+from PyQt5.QtCore import QObject, pyqtSignal, QTimer, pyqtSlot
 
 
 if __name__ != "__main__":
-    from front_panel.actions.display import update_plotted_signal
+    from front_panel.actions.compositor import DisplayCompositor
     from systems.horizontal_system.horizontal_functions import (
         get_current_delay,
         get_current_timebase,
     )
 
     from signal_generator import mem_depth, N_TDIV, N_VDIV
+    from signal_generator.streaming import PREVIEW_POINTS, StreamingSynthesizer
 else:
     import sys
     import os
 
     sys.path.append(os.path.abspath(os.path.join(os.path.dirname(__file__), "..")))
+    from signal_generator.streaming import PREVIEW_POINTS, StreamingSynthesizer
 
 import sys
 
+from signal_generator import N_ANALOG_CHANNELS, channel_sources
+from signal_generator.batched import BatchedSynthesizer
+from signal_generator.dds import dds_fill
+from signal_generator.frame_exchange import TripleBuffer
+from signal_generator.kernels import fused_sine_noise
+from signal_generator.latency import DEFAULT_DEBOUNCE, get_latency_tracker
+from signal_generator.noise import ParallelGaussianFiller, get_noise_bank, make_noise_bank
+from signal_generator.parameters import AcquisitionParameters, BatchParameters, ParameterStore
+from signal_generator.planner import get_planner
+from signal_generator.process_backend import POLL_INTERVAL, GeneratorProcess
+from signal_generator.pulses import sampled_pulse_shape, scatter_pulses, scatter_pulses_loop, tile_pulses
+from signal_generator.scheduler import DEFAULT_WAVEFORM_RATE, IDLE_POLL, AcquisitionScheduler
+from signal_generator.time_axis import TimeAxis, as_array
+from signal_generator.worker_pool import get_generator_pool
+from systems.horizontal_system.horizontal_functions import get_acquired_points, get_sample_rate
+
 has_trace = hasattr(sys, "gettrace") and sys.gettrace() is not None
 has_breakpoint = sys.breakpointhook.__module__ != "sys"
 isdebug = has_trace or has_breakpoint
@@ -39,9 +56,12 @@ the program it is desined for to work smoothly."""
 available_waveforms = ["sine", "square", "triangle", "sawtooth", "pulse_train", "pulse_train_conv"]
 
 _dtype = np.float32
+BATCH = "BATCH"  # mailbox of the frames of a BatchedSignalGenerator (rows of several channels)
 
 
 def _get_mem_depth_per_channel(active_channels: int) -> int:
+    """The acquisition memory is shared by the active channels: each of them gets
+    an equal part of `mem_depth` (all of it when a single channel is active)."""
     if active_channels:
         return int(mem_depth / active_channels)
     else:
@@ -49,84 +69,32 @@ def _get_mem_depth_per_channel(active_channels: int) -> int:
         return int(mem_depth)
 
 
-def _generate_basepoints(time_range, active_channels: int = 1):
-    mem_depth_channel = _get_mem_depth_per_channel(active_channels)
-    # Use _dtype instead of float64:
-    return np.linspace(
-        -float(time_range) / 2,
-        float(time_range) / 2,
-        mem_depth_channel,
-        endpoint=False,
-        dtype=_dtype,  # specify lower precision
-    )
-
-
-def _generate_timepoints(timebase: Decimal, active_channels: int, *args, **kwargs):
-    """These are timepoints that fit the screen or the oscilloscope's memory buffer"""
-    time_range = timebase * Decimal(N_TDIV)
-
-    if "trigger_delay" in kwargs:
-        delay: Decimal = kwargs["trigger_delay"]
-    else:
-        delay = Decimal(0)
-
-    if "previous_timepoints" not in kwargs:
-        kwargs["previous_timepoints"] = _generate_basepoints(time_range, active_channels)
+def _get_points_per_channel(timebase: Decimal, active_channels: int) -> int:
+    """Points acquired at the real sample rate (capped at the ADC rate), not the full memory depth."""
+    return get_acquired_points(timebase, _get_mem_depth_per_channel(active_channels))
 
-    timepoints = _generate_delayed_timepoints(
-        kwargs["previous_timepoints"], delay, parent=kwargs.get("parent", None), time_range=time_range
-    )
-    return timepoints
-
-
-def _generate_delayed_timepoints(
-    previous_timepoints: np.ndarray | None, delay: Decimal, out: np.ndarray = None, **kwargs
-) -> np.ndarray:
-    """
-    Generate a new array of timepoints by applying the trigger delay
-    directly on a stable baseline grid. This prevents the delay from being
-    applied cumulatively on already delayed timepoints, which can cause the
-    displayed data to disappear over successive iterations.
-
-    Parameters:
-      time_range (Decimal): The total time window (timebase * N_TDIV).
-      mem_depth (int): Number of samples per channel.
-      previous_timepoints (np.ndarray): Previously generated timepoints (used
-                                          here mainly to deduce dtype).
-      delay (Decimal): The trigger delay to apply.
-
-    Returns:
-      np.ndarray: New timepoints computed from a baseline grid shifted by delay.
-    """
-    # Apply the delay shift once, relative to the fixed baseline.
-    if "parent" not in kwargs or kwargs["parent"] is None:
-        base_t = _generate_basepoints(kwargs["time_range"])
-    else:
-        base_t = kwargs["parent"].base_t
 
-    # If no preallocated "out" buffer is provided, allocate one.
-    if out is None:
-        out = np.empty_like(base_t, dtype=_dtype)
+def _generate_time_axis(timebase: Decimal, active_channels: int, *args, **kwargs) -> TimeAxis:
+    """Implicit timepoints of the memory buffer (`as_array()` materializes them where needed)"""
+    delay: Decimal = kwargs.get("trigger_delay", Decimal(0))
+    return TimeAxis.from_timebase(timebase, _get_points_per_channel(timebase, active_channels), delay)
 
-    # Update the output array in place by subtracting the delay.
-    # Using np.subtract with the `out` parameter avoids a new allocation.
-    np.subtract(base_t, float(delay), out=out)
 
-    # Ensure proper data type (if needed, out should already have the correct dtype).
-    # If a conversion is needed, you might do this in-place by:
-    # out[:] = out.astype(dtype)
+def _generate_random_noise(timepoints, std_dev, out_noise=None, *args, rng=None, **kwargs):
+    """Take noise from the shared noise bank (a scaled copy of precomputed samples).
 
-    return out
+    Pass `rng` (a persistent `np.random.Generator` or a `ParallelGaussianFiller`)
+    to draw fresh float32 samples directly into `out_noise` instead."""
+    out_noise = _buffer(out_noise, timepoints)
 
+    if rng is None:
+        return get_noise_bank().fill(out_noise, std_dev)
+    if isinstance(rng, ParallelGaussianFiller):
+        return rng.fill(out_noise, std_dev)
 
-def _generate_random_noise(timepoints, std_dev, out_noise=None, *args, **kwargs):
-    rng = np.random.default_rng()
-    noise = rng.normal(loc=0.0, scale=std_dev, size=timepoints.shape).astype(_dtype)
-    if out_noise is not None:
-        out_noise[:] = noise
-        return out_noise
-    else:
-        return noise
+    rng.standard_normal(dtype=_dtype, out=out_noise)
+    np.multiply(out_noise, std_dev, out=out_noise)
+    return out_noise
 
 
 # def _generate_sine(freq, phase, timebase, noise_std_dev, active_channels=1, **kwargs):
@@ -155,54 +123,109 @@ def _generate_random_noise(timepoints, std_dev, out_noise=None, *args, **kwargs)
 
 #     return t, sine_wave, noise
 
-def _generate_sine(freq, phase, timebase, noise_std_dev, active_channels=1, out_wfm=None, **kwargs):
+def _generate_dds(shape, freq, phase, t: TimeAxis, out_wfm=None, width=1, **kwargs):
+    """Fill `out_wfm` from the cached wavetable of the `shape` (see `signal_generator.dds`).
+    The phase of the first sample is computed in float64 from the time axis."""
+    start_cycles = freq * t.t0 + phase / (2 * np.pi)
+    return dds_fill(_buffer(out_wfm, t), shape, freq, t.dt, start_cycles, width=width)
+
+
+def _buffer(out: NDArray | None, like: NDArray | TimeAxis) -> NDArray:
+    """Caller-provided output buffer (its leading part when it is sized for the full memory
+    depth and fewer points are acquired), or a new one when none was passed."""
+    return out[: len(like)] if out is not None else np.empty(like.shape, dtype=_dtype)
+
+
+def _phase_into(out: NDArray, t: TimeAxis, freq, phase) -> NDArray:
+    """Write 2*pi*freq*t + phase into `out` (computed in float64 from the time axis)."""
+    return t.affine(out, 2 * np.pi * freq, phase)
+
+
+def _generate_sine(
+    freq, phase, timebase, noise_std_dev, active_channels=1, out_wfm=None, out_noise=None, dds=False, **kwargs
+):
     logging.debug(
         f"generating sine with:\n\t{freq=},\n\t{phase=},\n\t{timebase=},\n\t{noise_std_dev=},\n\t{active_channels=}"
     )
-    t = kwargs.get("previous_timepoints", _generate_timepoints(timebase, active_channels, **kwargs))
-    
-    # Generate noise
-    noise = _generate_random_noise(t, noise_std_dev)
-    
-    # Check if out_wfm is provided, otherwise create one
-    if out_wfm is None:
-        sine_wave = np.sin(2 * np.pi * freq * t + phase).astype(_dtype)
-    else:
-        # Use the preallocated out_wfm buffer
-        np.sin(2 * np.pi * freq * t + phase, out=out_wfm)
-        sine_wave = out_wfm
+    t = _generate_time_axis(timebase, active_channels, **kwargs)
+    sine_wave = _buffer(out_wfm, t)
+
+    if not dds:
+        # Phase, sine and noise in one cache-blocked pass (see `signal_generator.kernels`)
+        noise = _buffer(out_noise, t)
+        fused_sine_noise(sine_wave, t, freq, phase, noise_std_dev, noise_out=noise)
+        return t, sine_wave, noise
+
+    _generate_dds("sine", freq, phase, t, out_wfm=sine_wave, **kwargs)
 
     # Add noise to the sine wave
+    noise = _generate_random_noise(t, noise_std_dev, out_noise=out_noise)
     np.add(sine_wave, noise, out=sine_wave)
 
     return t, sine_wave, noise
 
 
-def _generate_square(freq, phase, timebase, noise_std_dev, active_channels=1, **kwargs):
+def _generate_square(
+    freq, phase, timebase, noise_std_dev, active_channels=1, out_wfm=None, out_noise=None, dds=False, **kwargs
+):
     logging.debug(
         f"generating square with:\n\t{freq=},\n\t{phase=},\n\t{timebase=},\n\t{noise_std_dev=},\n\t{active_channels=}"
     )
-    t = getattr(
-        kwargs, "previous_timepoints", _generate_timepoints(timebase, active_channels, **kwargs)
-    )
+    t = _generate_time_axis(timebase, active_channels, **kwargs)
+    square_wave = _buffer(out_wfm, t)
 
-    noise = _generate_random_noise(t, noise_std_dev)
-    square_wave = signal.square(2 * np.pi * freq * t + phase).astype(_dtype)
+    if dds:
+        _generate_dds("square", freq, phase, t, out_wfm=square_wave, **kwargs)
+    else:
+        # Same as signal.square(phase): +1 in the first half of the period, -1 in the second
+        _phase_into(square_wave, t, freq, phase)
+        np.mod(square_wave, 2 * np.pi, out=square_wave)
+        np.subtract(square_wave, np.pi, out=square_wave)
+        np.copysign(1, square_wave, out=square_wave)
+        np.negative(square_wave, out=square_wave)
+
+    noise = _generate_random_noise(t, noise_std_dev, out_noise=out_noise)
     np.add(square_wave, noise, out=square_wave)
 
     return t, square_wave, noise
 
 
-def _generate_sawtooth(freq, phase, timebase, noise_std_dev, active_channels=1, width=1, **kwargs):
+def _generate_sawtooth(
+    freq, phase, timebase, noise_std_dev, active_channels=1, width=1, out_wfm=None, out_noise=None, dds=False, **kwargs
+):
     if width != 0.5:
         logging.debug(
             f"generating sawtooth with:\n\t{freq=},\n\t{phase=},\n\t{timebase=},\n\t{noise_std_dev=},\n\t{active_channels=}"
         )
-    t = getattr(
-        kwargs, "previous_timepoints", _generate_timepoints(timebase, active_channels, **kwargs)
-    )
-    noise = _generate_random_noise(t, noise_std_dev)
-    sawtooth_wave = signal.sawtooth(2 * np.pi * freq * t + phase, width).astype(_dtype)
+    t = _generate_time_axis(timebase, active_channels, **kwargs)
+    sawtooth_wave = _buffer(out_wfm, t)
+    noise = _buffer(out_noise, t)
+
+    if dds:
+        _generate_dds("sawtooth", freq, phase, t, out_wfm=sawtooth_wave, width=width, **kwargs)
+    else:
+        # Same as signal.sawtooth(phase, width) on the fraction of the period u:
+        # min(rising -1 + 2u/width, falling 1 - 2(u - width)/(1 - width))
+        u = sawtooth_wave
+        _phase_into(u, t, freq, phase)
+        np.mod(u, 2 * np.pi, out=u)
+        np.divide(u, 2 * np.pi, out=u)
+        if width >= 1:
+            np.multiply(u, 2, out=u)
+            np.subtract(u, 1, out=u)
+        elif width <= 0:
+            np.multiply(u, -2, out=u)
+            np.add(u, 1, out=u)
+        else:
+            falling = noise  # used as scratch before the noise is generated
+            np.subtract(u, width, out=falling)
+            np.multiply(falling, -2 / (1 - width), out=falling)
+            np.add(falling, 1, out=falling)
+            np.multiply(u, 2 / width, out=u)
+            np.subtract(u, 1, out=u)
+            np.minimum(u, falling, out=u)
+
+    _generate_random_noise(t, noise_std_dev, out_noise=noise)
     np.add(sawtooth_wave, noise, out=sawtooth_wave)
 
     return t, sawtooth_wave, noise
@@ -213,7 +236,22 @@ def _generate_triangle(freq, phase, timebase, noise_std_dev, active_channels=1,
         f"generating triangle with:\n\t{freq=},\n\t{phase=},\n\t{timebase=},\n\t{noise_std_dev=},\n\t{active_channels=}"
     )
 
-    return _generate_sawtooth(freq, phase, timebase, noise_std_dev, active_channels, width=0.5)  # type: ignore
+    return _generate_sawtooth(freq, phase, timebase, noise_std_dev, active_channels, width=0.5, **kwargs)  # type: ignore
+
+
+@lru_cache(maxsize=8)
+def _get_center_indices(t: TimeAxis, num_pulses: int, repetition_rate) -> NDArray:
+    """Indices of the pulse centers (spaced by 1/repetition_rate around the trigger) in
+    the time axis (read-only, cached: they only change with the timebase and delay)."""
+    pulse_centers = np.linspace(
+        -((num_pulses - 1) / repetition_rate) / 2,
+        ((num_pulses - 1) / repetition_rate) / 2,
+        num_pulses,
+        dtype=_dtype,
+    )
+    center_indices = t.index(pulse_centers)
+    center_indices.flags.writeable = False
+    return center_indices
 
 
 def _generate_pulse_train(
@@ -223,9 +261,12 @@ def _generate_pulse_train(
     pulse_width=1e-9,
     repetition_rate=1e3,
     dtype=_dtype,
+    out_wfm=None,
+    out_noise=None,
     **kwargs,
 ):
-    """Use this method for small number of pulses"""
+    """The pulses are placed by the strategy the planner estimates to be the cheapest
+    (see `signal_generator.planner`)."""
     # Determine how many pulses (round up) you need.
     num_pulses = int(np.ceil(float(timebase) * N_TDIV * repetition_rate))
 
@@ -233,66 +274,57 @@ def _generate_pulse_train(
     if num_pulses % 2 == 0:
         num_pulses += 1
 
-    if num_pulses > 4e5:
-        logging.info("Number of pulses exceeds 400k. Switching to convolution method.")
+    # Estimate the pulse width and period in samples before allocating anything
+    points = _get_points_per_channel(timebase, active_channels)
+    samples_per_second = get_sample_rate(timebase, _get_mem_depth_per_channel(active_channels))
+    window = 2 * int(np.ceil(5 * pulse_width * samples_per_second)) + 1
+    period = samples_per_second / repetition_rate
+    periodic = period.is_integer() and period >= window
+
+    planner = get_planner()
+    strategy = planner.choose(num_pulses, window, points, periodic)
+    if strategy in ("fft", "overlap_add"):
+        logging.info(f"Generating {num_pulses} pulses by convolution ({strategy}).")
         return _generate_pulse_train_convolution(
-            timebase, noise_std_dev, active_channels, pulse_width, repetition_rate, **kwargs
+            timebase,
+            noise_std_dev,
+            active_channels,
+            pulse_width,
+            repetition_rate,
+            method=strategy,
+            out_wfm=out_wfm,
+            out_noise=out_noise,
+            **kwargs,
         )
 
     # Generate the common timepoints and noise.
-    t = _generate_timepoints(timebase, active_channels, **kwargs)
-    noise = _generate_random_noise(t, noise_std_dev)
+    t = _generate_time_axis(timebase, active_channels, **kwargs)
+    noise = _generate_random_noise(t, noise_std_dev, out_noise=out_noise)
 
     # Initialize the pulse train
-    pulse_train = np.zeros_like(t)
+    pulse_train = _buffer(out_wfm, t)
+    pulse_train.fill(0)
 
-    # Sample interval for t
-    dt_sample = t[1] - t[0]
+    # Sample interval of the time axis
+    dt_sample = t.dt
 
-    # Define a window that covers ±5*pulse_width
-    window_n = int(np.ceil(5 * pulse_width / dt_sample))
+    # Pulse shape (envelope and modulation) on a window that covers ±5*pulse_width
+    pulse_shape = sampled_pulse_shape(dt_sample, pulse_width)
 
-    # Create a local time grid for calculating pulse shape
-    dt_local = np.linspace(
-        -window_n * dt_sample, window_n * dt_sample, 2 * window_n + 1, dtype=_dtype
-    )
-
-    # Precompute the pulse shape (envelope and modulation) on this grid
-    pulse_shape = np.exp(-(dt_local**2) / (2 * pulse_width**2)) * (
-        1 + erf(4.5 * dt_local / (np.sqrt(2) * pulse_width))
-    )
-
-    # Precompute pulse centers
-    pulse_centers = np.linspace(
-        -((num_pulses - 1) / repetition_rate) / 2,
-        ((num_pulses - 1) / repetition_rate) / 2,
-        num_pulses,
-        dtype=_dtype,
-    )
-
-    # For each pulse, add the precomputed pulse shape at the correct location
-    for center in pulse_centers:
-        # Find the index where the pulse center goes
-        center_idx = np.searchsorted(t, center)
-
-        # Determine the indices in t that will be updated by this pulse
-        idx_start = center_idx - window_n
-        idx_end = center_idx + window_n + 1  # +1 because slicing excludes the end
-
-        # Adjust in case the window goes out of bounds (pulse might not fit in the data)
-        valid_start = max(idx_start, 0)
-        valid_end = min(idx_end, len(t))
-
-        # Determine the corresponding slice in t of the precomputed pulse shape
-        pulse_shape_start = valid_start - idx_start
-        pulse_shape_end = pulse_shape_start + (valid_end - valid_start)
-
-        pulse_train[valid_start:valid_end] += pulse_shape[pulse_shape_start:pulse_shape_end]
+    # Add the precomputed pulse shape at all pulse locations
+    center_indices = _get_center_indices(t, num_pulses, repetition_rate)
+    if strategy == "tiling" and not tile_pulses(pulse_train, center_indices, pulse_shape):
+        strategy = planner.choose(num_pulses, len(pulse_shape), len(t), periodic=False)
+    if strategy == "scatter":
+        scatter_pulses(pulse_train, center_indices, pulse_shape)
+    elif strategy != "tiling":
+        scatter_pulses_loop(pulse_train, center_indices, pulse_shape)
 
     # Normalize the pulse train, ensuring the peak amplitude is 1.
-    pulse_train /= np.max(np.abs(pulse_train))
+    pulse_train /= max(pulse_train.max(), -pulse_train.min())  # max(abs()) without a temporary
 
-    return t, pulse_train + noise, noise
+    np.add(pulse_train, noise, out=pulse_train)
+    return t, pulse_train, noise
 
 
 def _generate_pulse_train_convolution(
@@ -302,9 +334,13 @@ def _generate_pulse_train_convolution(
     pulse_width=1e-9,
     repetition_rate=1e3,
     dtype=_dtype,
+    method="fft",
+    out_wfm=None,
+    out_noise=None,
     **kwargs,
 ):
-    """Use this method for large number of pulses"""
+    """Use this method for large number of pulses. `method` is "fft" (one FFT of the whole
+    memory) or "overlap_add" (FFTs of short blocks, better for narrow pulses)."""
     # Determine how many pulses to create.
     num_pulses = int(np.ceil(float(timebase) * N_TDIV * repetition_rate))
     # Make it odd to center nicely around zero.
@@ -312,50 +348,37 @@ def _generate_pulse_train_convolution(
         num_pulses += 1
 
     # Generate the global time array and noise.
-    t = _generate_timepoints(timebase, active_channels, **kwargs)
-    noise = _generate_random_noise(t, noise_std_dev)
+    t = _generate_time_axis(timebase, active_channels, **kwargs)
+    noise = _generate_random_noise(t, noise_std_dev, out_noise=out_noise)
 
     # Compute the sample spacing.
-    dt_sample = t[1] - t[0]
+    dt_sample = t.dt
 
     # Precompute the canonical pulse shape.
-    window_n = int(np.ceil(5 * pulse_width / dt_sample))
-
-    # Create a local time grid for one pulse.
-    dt_local = np.linspace(
-        -window_n * dt_sample, window_n * dt_sample, 2 * window_n + 1, dtype=_dtype
-    )
-    pulse_shape = np.exp(-(dt_local**2) / (2 * pulse_width**2)) * (
-        1 + erf(4.5 * dt_local / (np.sqrt(2) * pulse_width))
-    )
-
-    # Create an impulse train: an array of zeros with ones (or weights) at pulse center indices.
-    impulse_train = np.zeros_like(t)
-
-    # Compute pulse centers in time.
-    pulse_centers = np.linspace(
-        -((num_pulses - 1) / repetition_rate) / 2,
-        ((num_pulses - 1) / repetition_rate) / 2,
-        num_pulses,
-        dtype=_dtype,
-    )
+    pulse_shape = sampled_pulse_shape(dt_sample, pulse_width)
 
-    # Convert pulse centers to indices in t
+    # Pulse centers as indices in t
     # Ensure that every pulse center corresponds to a valid index in t
-    pulse_indices = np.searchsorted(t, pulse_centers, side="left")
-    pulse_indices = np.clip(pulse_indices, 0, len(t) - 1)
+    pulse_indices = np.clip(_get_center_indices(t, num_pulses, repetition_rate), 0, len(t) - 1)
 
-    # Use np.bincount to add up impulses (in case multiple pulses fall in the same index)
-    impulse_train = np.bincount(pulse_indices, minlength=len(t))
+    # Create an impulse train in the output buffer: zeros with ones at pulse center indices
+    # (np.add.at adds up impulses in case multiple pulses fall in the same index)
+    pulse_train = _buffer(out_wfm, t)
+    pulse_train.fill(0)
+    np.add.at(pulse_train, pulse_indices, 1)
 
     # Convolve the impulse train with the precomputed pulse shape.
-    # fftconvolve is very efficient for large arrays.
-    pulse_train = signal.fftconvolve(impulse_train, pulse_shape, mode="same")
+    # fftconvolve is very efficient for large arrays (its FFT buffers are its own).
+    if method == "overlap_add":
+        np.copyto(pulse_train, signal.oaconvolve(pulse_train, pulse_shape, mode="same"))
+    else:
+        np.copyto(pulse_train, signal.fftconvolve(pulse_train, pulse_shape, mode="same"))
 
     # Normalize so that the peak is at 1
-    pulse_train /= np.max(np.abs(pulse_train))
+    pulse_train /= max(pulse_train.max(), -pulse_train.min())
 
-    return t, pulse_train + noise, noise
+    np.add(pulse_train, noise, out=pulse_train)
+    return t, pulse_train, noise
 
 
 def _calculate_rise_time(signal, t):
@@ -381,7 +404,9 @@ def _calculate_rise_time(signal, t):
     return delta_x * 1e9, x_10, x_90
 
 
-def get_waveform(*args, out_t=None, out_wfm=None, out_noise=None, **kwargs):
+def get_waveform(*args, out_wfm=None, out_noise=None, **kwargs):
+    """Returns (t, wfm, noise) where `t` is the implicit `TimeAxis` of the samples
+    (use `as_array(t)` where the timepoints are really needed as an array)."""
     if "waveform" not in kwargs:
         logging.error("Provide waveform type.")
         return
@@ -393,51 +418,47 @@ def get_waveform(*args, out_t=None, out_wfm=None, out_noise=None, **kwargs):
 
     # if connector is unplugged, return noise only
     if "connector_state" not in kwargs or not kwargs["connector_state"]:
-        # Update the preallocated timepoints buffer if provided.
-        if out_t is not None:
-            out_t[:] = _generate_timepoints(*args, **kwargs)
-        else:
-            out_t = _generate_timepoints(*args, **kwargs)
-        
-        # Generate noise in place: check if an output noise buffer was provided.
+        t = _generate_time_axis(*args, **kwargs)
+        out_noise = _buffer(out_noise, t)
+
+        # Generate noise in place into the output noise buffer.
         if "noise_std_dev" in kwargs:
-            std_dev = kwargs["noise_std_dev"]
-            # Check if an out_noise buffer is provided.
-            if out_noise is not None:
-                _generate_random_noise(out_t, std_dev, out_noise=out_noise, *args, **kwargs)
-            else:
-                out_noise = _generate_random_noise(out_t, std_dev, *args, **kwargs)
-            
-            # For a connector-unplugged state, you might want to use the noise as both waveform and noise.
-            return out_t, out_noise, out_noise
+            _generate_random_noise(t, kwargs["noise_std_dev"], out_noise=out_noise)
         else:
-            return out_t, np.zeros_like(out_t), np.zeros_like(out_t)
+            out_noise.fill(0)
+
+        # For a connector-unplugged state, the noise is the waveform.
+        if out_wfm is None:
+            return t, out_noise, out_noise
+        out_wfm = _buffer(out_wfm, t)
+        np.copyto(out_wfm, out_noise)
+        return t, out_wfm, out_noise
 
     waveform = kwargs.get("waveform")
     match waveform:
         case "sine":
             return _generate_sine(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case "square":
             return _generate_square(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case "triangle":
             return _generate_triangle(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case "sawtooth":
             return _generate_sawtooth(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case "pulse_train":
             return _generate_pulse_train(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case "pulse_train_conv":
             return _generate_pulse_train_convolution(
-                *args, out_t=out_t, out_wfm=out_wfm, out_noise=out_noise, **kwargs
+                *args, out_wfm=out_wfm, out_noise=out_noise, **kwargs
             )
         case _:
             logging.debug("Unsupported waveform.")
@@ -447,116 +468,160 @@ def get_waveform(*args, out_t=None, out_wfm=None, out_noise=None, **kwargs):
 def _re_noise(t, wfm, noise, noise_std_dev):
     """Use to refresh noise data - simulate "constantly" incoming signals"""
 
-    new_noise = _generate_random_noise(t, noise_std_dev)
-
     # Replace the old noise with new one (in-place to save RAM)
     np.subtract(wfm, noise, out=wfm)
+    new_noise = _generate_random_noise(t, noise_std_dev, out_noise=noise)
     np.add(wfm, new_noise, out=wfm)
 
     return t, wfm, new_noise
 
 
 class SignalManager:
-    def __init__(self, parent):
+    """Registry of the running signal sources, the analog channels 1..n_channels. Their
+    generators are stepped by the shared, bounded pool of worker threads instead of one
+    thread per channel.
+    With the "batched" backend all channels share one `BatchedSignalGenerator`."""
+
+    def __init__(self, parent, n_channels: int = N_ANALOG_CHANNELS):
         super().__init__()
         self.parent = parent
-        self.running_threads = []
+        self.sources: tuple[int, ...] = channel_sources(n_channels)
+        self.generators: dict[int, "SignalGenerator | ProcessSignalGenerator"] = {}
+        # (signal, slot) pairs to disconnect, per channel (connector) and per generator (knobs)
+        self._connections: dict[object, list] = {}
+        self.pool = get_generator_pool()
+        # One coalesced redraw per screen refresh for all channels
+        self.compositor = DisplayCompositor(parent)
+        self.persistence = None  # PersistenceAccumulator while the persistence display is on
+        # Zoom and pan over the held frames while the acquisition is stopped
+        for knob_selected in (getattr(parent, "timebase_selected", None), getattr(parent, "delay_selected", None)):
+            if knob_selected is not None:
+                knob_selected.connect(self.compositor.render_held)
 
     def start_signal_generator(self, channel: int, connector_state: bool):
-        if channel == 1:
-            # Ensure the previous thread is properly finished
-            if hasattr(self, "channel1_thread") and self.channel1_thread is not None:
-                self.stop_signal_generator(channel)
-            if hasattr(self, "channel1_generator") and self.channel1_generator is not None:
-                self.stop_signal_generator(channel)
-            # Define worker thread
-            self.channel1_thread = QThread()
-            self.running_threads.append(self.channel1_thread)
-            self.channel1_generator = SignalGenerator(self.parent, channel, connector_state)
-            self.channel1_generator.moveToThread(self.channel1_thread)
-            self.channel1_thread.started.connect(self.channel1_generator.run)
-            self.channel1_generator.finished.connect(self.channel1_thread.quit)
-            self.channel1_generator.finished.connect(self.channel1_generator.deleteLater)
-            self.channel1_thread.finished.connect(self.channel1_thread.deleteLater)
-            self.channel1_generator.progress.connect(self._reportProgress)
-            self.parent.timebase_selected.connect(
-                lambda tb: self.channel1_generator.update_timebase(tb)  # type: ignore
-            )
-            self.parent.delay_selected.connect(
-                lambda delay: self.channel1_generator.update_trigger_delay(delay)  # type: ignore
-            )
-            self.parent.connector1_toggled.connect(
-                lambda state: self.channel1_generator.update_connector_state(state)  # type: ignore
-            )
-            self.channel1_thread.start()
-
-        elif channel == 2:
-            # Ensure the previous thread is properly finished
-            if hasattr(self, "channel2_thread") and self.channel2_thread is not None:
-                self.stop_signal_generator(channel)
-            if hasattr(self, "channel2_generator") and self.channel2_generator is not None:
-                self.stop_signal_generator(channel)
-            # Define worker thread
-            self.channel2_thread = QThread()
-            self.running_threads.append(self.channel1_thread)
-            self.channel2_generator = SignalGenerator(self.parent, channel, connector_state)
-            self.channel2_generator.moveToThread(self.channel2_thread)
-            self.channel2_thread.started.connect(self.channel2_generator.run)
-            self.channel2_generator.finished.connect(self.channel2_thread.quit)
-            self.channel2_generator.finished.connect(self.channel2_generator.deleteLater)
-            self.channel2_thread.finished.connect(self.channel2_thread.deleteLater)
-            self.channel2_generator.progress.connect(self._reportProgress)
-            self.parent.timebase_selected.connect(
-                lambda tb: self.channel2_generator.update_timebase(tb)  # type: ignore
-            )
-            self.parent.delay_selected.connect(
-                lambda delay: self.channel2_generator.update_trigger_delay(delay)  # type: ignore
-            )
-            self.parent.connector2_toggled.connect(
-                lambda state: self.channel2_generator.update_connector_state(state)  # type: ignore
+        if channel not in self.sources:
+            logging.debug(f"Invalid channel {channel!r}. Accepts {', '.join(map(str, self.sources))} only.")
+            return
+        # Ensure the previous generator is properly finished
+        if channel in self.generators:
+            self.stop_signal_generator(channel)
+
+        generator = self._running_batch()
+        if generator is not None:
+            generator.add_channel(channel, connector_state)
+        else:
+            generator = self._generator_class()(self.parent, channel, connector_state)
+            self._connect_frames(generator)
+            self._connect(
+                generator,
+                (self.parent.timebase_selected, generator.update_timebase),
+                (self.parent.delay_selected, generator.update_trigger_delay),
             )
-            self.channel2_thread.start()
+            if isinstance(generator, SignalGenerator):
+                generator.scheduler.on_change = lambda: self.pool.wake(generator)
+            generator.persistence = self.persistence
+            if not self.compositor.holding:
+                self.pool.submit(generator)
+            elif isinstance(generator, ProcessSignalGenerator):
+                generator.hold(True)
+        self.generators[channel] = generator
+
+        connector_toggled = getattr(self.parent, f"connector{channel}_toggled", None)  # channels with a connector
+        if connector_toggled is not None:
+            if isinstance(generator, BatchedSignalGenerator):
+                self._connect(channel, (connector_toggled, partial(generator.update_channel_connector_state, channel)))
+            else:
+                self._connect(channel, (connector_toggled, generator.update_connector_state))
+
+    def stop_signal_generator(self, channel: int):
+        generator = self.generators.pop(channel, None)
+        if generator is None:
+            logging.debug(f"No signal generator of channel {channel!r} is running.")
+            return
+        self._disconnect(channel)
+        if generator in self.generators.values():
+            # A batch that still acquires other channels
+            generator.remove_channel(channel)  # type: ignore
+            print(f"Channel {channel} removed from the batch.")
+            return
 
+        self._disconnect(generator)
+        generator.stop()
+        self.pool.remove(generator)  # waits for a step in progress
+        generator.close()
+        generator.deleteLater()
+        print(f"Signal generator of channel {channel} stopped.")
+
+    def hold_acquisition(self, stopped: bool):
+        """Stop (hold the last frames on the display for zoom and pan) or resume acquiring."""
+        generators = list(dict.fromkeys(self.generators.values()))  # a batch only once
+        if stopped:
+            for generator in generators:
+                self.pool.remove(generator)  # waits for a step in progress
+                if isinstance(generator, ProcessSignalGenerator):
+                    generator.hold(True)  # the worker process acquires on its own
+            self.compositor.hold()
         else:
-            logging.debug("Invalid channel number. Accepts 1 and 2 only.")
-
-    def stop_signal_generator(self, channel):
-        if (
-            channel == 1
-            and self.channel1_thread is not None
-            and self.channel1_generator is not None
-            and self.channel1_generator.is_running()
-        ):
-            self.channel1_generator.stop()
-            self.channel1_thread.quit()
-            self.channel1_thread.wait()
-            self.channel1_thread = None
-            self.channel1_generator = None
-            print("Thread for channel 1 quitted.")
-        elif (
-            channel == 2
-            and self.channel2_thread is not None
-            and self.channel2_generator is not None
-            and self.channel2_generator.is_running()
-        ):
-            self.channel2_generator.stop()
-            self.channel2_thread.quit()
-            self.channel2_thread.wait()
-            self.channel2_thread = None
-            self.channel2_generator = None
-            print("Thread for channel 2 quitted.")
+            self.compositor.release()
+            for generator in generators:
+                if isinstance(generator, ProcessSignalGenerator):
+                    generator.hold(False)
+                self.pool.submit(generator)
+
+    def set_persistence(self, accumulator):
+        """Let every generator accumulate its acquisitions into `accumulator` (None: off)."""
+        self.persistence = accumulator
+        self.compositor.set_persistence(accumulator)
+        for generator in self.generators.values():
+            generator.persistence = accumulator
+
+    def _connect(self, key, *connections):
+        for signal, slot in connections:
+            signal.connect(slot)
+        self._connections.setdefault(key, []).extend(connections)
+
+    def _disconnect(self, key):
+        for signal, slot in self._connections.pop(key, []):
+            try:
+                signal.disconnect(slot)
+            except TypeError:
+                pass
+
+    def _running_batch(self) -> "BatchedSignalGenerator | None":
+        if getattr(self.parent, "backend", "thread") != "batched":
+            return None
+        return next((g for g in self.generators.values() if isinstance(g, BatchedSignalGenerator)), None)
+
+    def _generator_class(self):
+        """`SignalGenerator` stepped in this process, `ProcessSignalGenerator` when the "process"
+        backend is selected in the Acquire settings, `BatchedSignalGenerator` for "batched"."""
+        backend = getattr(self.parent, "backend", "thread")
+        if backend == "process":
+            return ProcessSignalGenerator
+        if backend == "batched":
+            return BatchedSignalGenerator
+        return SignalGenerator
+
+    def _connect_frames(self, generator):
+        if isinstance(generator, SignalGenerator):
+            generator.frame_ready.connect(self._readFrame)
         else:
-            logging.debug("Invalid channel number. Accepts 1 and 2 only.")
+            generator.progress.connect(self._reportProgress)
+
+    def _readFrame(self, channel, frames: TripleBuffer):
+        """The compositor reads the latest complete frame on its next tick (it stays
+        untouched by the generator until the next read)."""
+        self.compositor.deposit_source(channel, frames)
 
     def _reportProgress(self, channel, t, wfm):
         """This function will be responsible for plotting updated signal."""
         if self.parent:
-            update_plotted_signal(self.parent, channel, t, wfm)
+            self.compositor.deposit(channel, t, wfm)
 
 
 class SignalGenerator(QObject):
     finished = pyqtSignal()
-    progress = pyqtSignal(int, object, object)
+    frame_ready = pyqtSignal(object, object)  # channel, TripleBuffer with a new frame
 
     def __init__(self, parent, channel, connector_state, *args, waveform="sine", **kwargs):
         super().__init__()
@@ -564,32 +629,52 @@ class SignalGenerator(QObject):
         self.running = True
         self.waveform = waveform
         self.channel = channel
-        self.connector_state = connector_state
-        self.timebase: Decimal = get_current_timebase(self.parent)
-        self.trigger_delay: Decimal = get_current_delay(self.parent, self.timebase)
-        self.base_t = _generate_basepoints(self.timebase * Decimal(N_TDIV))
 
-        # BUFFERING THE DATA ACQUISITION AND UPDATE
-        self.t_buffer = np.empty_like(self.base_t)
-        self.wfm_buffer = np.empty_like(self.base_t)
-        self.noise_buffer = np.empty_like(self.base_t)
+        # ACQUISITION PARAMETERS: immutable snapshots published by the GUI thread (knob slots),
+        # the worker acquires with the snapshot it took last (self.snapshot).
+        timebase = get_current_timebase(self.parent)
+        self.parameters = ParameterStore(
+            AcquisitionParameters(
+                timebase=timebase,
+                trigger_delay=get_current_delay(self.parent, timebase),
+                connector_state=connector_state,
+                memory_depth=_get_mem_depth_per_channel(1),
+            )
+        )
+        self.snapshot = self.parameters.current
 
-        self.t = self.t_buffer
-        self.wfm = self.wfm_buffer
-        self.noise = self.noise_buffer
+        # BUFFERING THE DATA ACQUISITION AND UPDATE
+        # (the timepoints are implicit: t0 + k*dt, no array is kept)
+        # Three frames of the full memory depth rotate between this generator and the display,
+        # fast timebases acquire only their leading part.
+        self.frames = TripleBuffer(self.snapshot.memory_depth, dtype=_dtype)
         # END OF BUFFER DEFINITIONS
 
+        # Phase-continuous source of the acquisitions (created in run())
+        self.synthesizer: StreamingSynthesizer | None = None
+
+        # RANDOM NUMBERS: the process-wide noise bank, or a bank of its own for a reproducible
+        # (seeded) generator
+        seed = kwargs.get("seed", None)
+        self.noise_bank = get_noise_bank() if seed is None else make_noise_bank(np.random.SeedSequence(seed))
+
         if "noise_std_dev" in kwargs:
             self.noise_std_dev = kwargs["noise_std_dev"]
 
-        # Create a queue to store update events (can store parameter names or even full state snapshots)
-        self.update_queue = deque()
+        # Direct digital synthesis of the periodic waveforms (wavetable lookup)
+        self.dds = kwargs.get("dds", True)
+
+        # Pace of the acquisitions (target waveform rate, backpressure from the display, idling)
+        self.scheduler = AcquisitionScheduler(
+            kwargs.get("waveform_rate", getattr(self.parent, "waveform_rate", DEFAULT_WAVEFORM_RATE))
+        )
 
         # Create a debouncing QTimer for processing GUI events.
+        # Its interval follows the measured acquisition latency of the new settings
+        # (see _restart_debounce()), the default only applies until something was measured.
+        self.latency = get_latency_tracker()
         self.update_timer = QTimer()
-        self.update_timer.setInterval(
-            100
-        )  # 100 ms debounce interval is enough to process the timepoints generation (30-70 ms)
+        self.update_timer.setInterval(int(DEFAULT_DEBOUNCE * 1000))
         self.update_timer.setSingleShot(True)
         self.update_timer.timeout.connect(self.perform_update)
 
@@ -599,59 +684,105 @@ class SignalGenerator(QObject):
         # self.throttle_timer.timeout.connect(self.perform_update)
         # self.throttle_timer.start()
 
-        # Create a flag to (dis)allow processing the updates
-        self._update_pending = False
+        # CANCELLABLE ACQUISITION: the full acquisition runs in chunks (one per step), a knob
+        # change aborts it and shows a decimated preview right away, the full acquisitions
+        # resume once the debounce period has expired.
+        self._job = None  # chunked acquisition in progress
+        self._settling = False  # between a knob change and the end of its debounce period
+        self._last_preview = float("-inf")
+        self._job_time = 0.0  # s spent in the chunks of the job in progress
+        self.aborted_jobs = 0
+
+        # Persistence display: every complete acquisition is counted into its hit-count image
+        self.persistence = None
+
+    @property
+    def timebase(self) -> Decimal:
+        return self.parameters.current.timebase
+
+    @property
+    def trigger_delay(self) -> Decimal:
+        return self.parameters.current.trigger_delay
+
+    @property
+    def connector_state(self) -> bool:
+        return self.parameters.current.connector_state
 
     @pyqtSlot(Decimal)
     def update_timebase(self, timebase: Decimal):
         """Receive signal that the timebase changed."""
-        # Enqueue the update
-        self.update_queue.append(("timebase", timebase))
-        # Update the current state and recalculate base timepoints.
-        self.timebase = timebase
-        self.base_t = _generate_basepoints(self.timebase * Decimal(N_TDIV))
-        # Re(start) the timer for debounce (required for updating the waveform)
-        self.update_timer.start()
+        # Publish the new state
+        self.parameters.update(timebase=timebase)
+        self._settle()
 
     @pyqtSlot(bool)
     def update_connector_state(self, connector_state: bool):
         """Receive signal that the connector is (un)plugged."""
-        # Update the current state
-        self.connector_state = connector_state
-        # Re(start) the timer for debounce (required for updating the waveform)
-        self.update_timer.start()
+        # Publish the new state (used by the next acquisition directly)
+        self.parameters.update(connector_state=connector_state)
+        self.scheduler.notify_change()
 
-    @pyqtSlot(bool)
+    @pyqtSlot(Decimal)
     def update_trigger_delay(self, delay: Decimal):
-        # Enqueue the update
-        self.update_queue.append(("trigger_delay", delay))
-        # Update the current state
-        self.trigger_delay = delay
-        # Re(start) the timer for debounce (required for updating the waveform)
+        # Publish the new state
+        self.parameters.update(trigger_delay=delay)
+        self._settle()
+
+    def _settle(self):
+        """Hold the full acquisitions back until the knob rests for the debounce period
+        (the snapshot change itself aborts the acquisition in flight and shows a preview)."""
+        self._settling = True
+        self.scheduler.notify_change()
+        # (Re)start the debounce timer with an interval fitted to the measured latency
+        # of a full acquisition at the new settings
+        snapshot = self.parameters.current
+        debounce = self.latency.debounce(self.waveform, snapshot.memory_depth, snapshot.timebase, snapshot.points)
+        self.update_timer.setInterval(int(round(debounce * 1000)))
         self.update_timer.start()
 
     def perform_update(self):
-        """Controls the flag for whether run() should perform waveform update"""
-        self._update_pending = True
-
-    def initialize_waveform(self, *args, **kwargs):
-        result = get_waveform(
-            *args,
-            out_t=self.t_buffer,
-            out_wfm=self.wfm_buffer,
-            out_noise=self.noise_buffer,
-            **kwargs,
+        """Controls the flag for whether step() should resume the full acquisitions"""
+        self._settling = False
+        self.scheduler.notify_change()
+
+    def acquire(self, snapshot: AcquisitionParameters | None = None) -> bool:
+        """Capture the next acquisition of the signal stream into the back frame and publish it.
+        Returns True when the display has to be notified of a new frame."""
+        snapshot = snapshot or self.snapshot
+        for _ in self.acquire_steps(snapshot):
+            pass
+        return self.publish(snapshot.time_axis, snapshot.points, snapshot)
+
+    def publish(self, t: TimeAxis, n: int, snapshot: AcquisitionParameters) -> bool:
+        """Publish the back frame (see `TripleBuffer.publish()`)."""
+        return self.frames.publish(t, n)
+
+    def acquire_steps(self, snapshot: AcquisitionParameters):
+        """Chunks of the next acquisition into the back frame (published by the caller)."""
+        frame = self.frames.back()
+        t = snapshot.time_axis
+        return self.synthesizer.acquire_steps(  # type: ignore
+            frame.data[: snapshot.points], t.t0, t.dt, connector_state=snapshot.connector_state
         )
-        if not result:
-            print("result is None")
-            return
 
-        self.t[:] = self.t_buffer
-        self.wfm[:] = self.wfm_buffer
-        self.noise[:] = self.noise_buffer
-    
-    def run(self):
-        """Generate/update the signal"""
+    def persist(self, snapshot: AcquisitionParameters):
+        """Count the complete acquisition in the back frame into the persistence image
+        (in the worker, before it is published)."""
+        if self.persistence is not None:
+            self.persistence.accumulate(self.channel, snapshot.time_axis, self.frames.back().data[: snapshot.points])
+
+    def preview(self, snapshot: AcquisitionParameters) -> bool:
+        """Publish a decimated pass of the acquisition settings (as plotted)."""
+        factor = max(1, -(-snapshot.points // PREVIEW_POINTS))
+        t = snapshot.time_axis[::factor]
+        frame = self.frames.back()
+        self.synthesizer.preview(  # type: ignore
+            frame.data[: len(t)], t.t0, t.dt, connector_state=snapshot.connector_state
+        )
+        return self.publish(t, len(t), snapshot)
+
+    def setup(self):
+        """Create the synthesizer (in the worker, on the first step)."""
         if isdebug:
             debugpy.debug_this_thread()
         # TEST VALUES
@@ -660,83 +791,286 @@ class SignalGenerator(QObject):
         if self.channel == 2:
             phase = np.pi / 2
         # END OF TEST VALUES
-        
+
         print("Initializing waveform")
-        self.initialize_waveform(
+        self.synthesizer = StreamingSynthesizer(
             waveform=self.waveform,
-            connector_state=self.connector_state,
-            trigger_delay=self.trigger_delay,
-            previous_timepoints=self.base_t,
             freq=50e6,
             phase=phase,
-            timebase=self.timebase,
             noise_std_dev=self.noise_std_dev,
-            active_channels=1,
             pulse_width=1e-9,
             repetition_rate=88e6,
-            parent=self,
+            noise_bank=self.noise_bank,
+            dds=self.dds,
         )
         print("Waveform initialized")
-        
-        while self.running:
-            if not self.running:
-                break
-
-            if self._update_pending:
-                # Allowed only after the debounce period has expired
-
-                # Only the final state matters, so we simply clear the queue.
-                while self.update_queue:
-                    _ = self.update_queue.popleft()
-                    # if update_type == "timebase":
-                    #     # Update timebase-specific behavior here.
-                    #     self.timebase = value
-                    #     self.base_t = _generate_basepoints(self.timebase * Decimal(N_TDIV))
-                    # elif update_type == "trigger_delay":
-                    #     self.trigger_delay = value
-
-                result = get_waveform(
-                    waveform=self.waveform,
-                    connector_state=self.connector_state,
-                    trigger_delay=self.trigger_delay,
-                    previous_timepoints=self.base_t,
-                    freq=50e6,
-                    phase=phase,
-                    timebase=self.timebase,
-                    noise_std_dev=self.noise_std_dev,
-                    active_channels=1,
-                    pulse_width=1e-9,
-                    repetition_rate=88e6,
-                    parent=self,
-                    out_t=self.t_buffer,
-                    out_wfm=self.wfm_buffer,
-                    out_noise=self.noise_buffer,
-                )
-                if not result:
-                    print("result is None")
-                    return
-
-                # In-place update
-                self.t[:] = self.t_buffer
-                self.wfm[:] = self.wfm_buffer
-                self.noise[:] = self.noise_buffer
-
-                # Reset _update_pending flag
-                self._update_pending = False
-
-            # if display is idly showing signal (no gui changes), update only noise
-            else:
-                self.t, self.wfm, self.noise = _re_noise(
-                    self.t, self.wfm, self.noise, self.noise_std_dev
-                )
 
-            self.progress.emit(self.channel, self.t, self.wfm)
+    def step(self) -> float | None:
+        """Generate/update the signal: acquire one frame if it is due. Returns the seconds
+        until the next step, None once the generator is stopped."""
+        if not self.running:
+            return None
+        if self.synthesizer is None:
+            self.setup()
+
+        snapshot = self.parameters.current  # one consistent set of parameters for this step
+        if snapshot.version != self.snapshot.version:
+            # The parameters changed: the acquisition in flight is outdated
+            if self._job is not None:
+                self._job.close()
+                self._job = None
+                self.aborted_jobs += 1
+            if snapshot.window != self.snapshot.window:
+                # A knob turned: show the new settings at once, but not more often than the
+                # coalescing window (later knob events join this preview)
+                wait = self._last_preview + self.latency.coalescing_window(self.waveform) - time.perf_counter()
+                if wait > 0:
+                    return wait
+                tic = time.perf_counter()
+                notify = self.preview(snapshot)
+                self._last_preview = time.perf_counter()
+                self.latency.record_preview(self.waveform, self._last_preview - tic)
+                if notify:
+                    self.frame_ready.emit(self.channel, self.frames)
+            self.snapshot = snapshot
+        if self._settling:
+            return IDLE_POLL  # woken up by the next change or by the end of the debounce period
+
+        if self._job is None:
+            # Wait for the next frame: at the target rate, not while the display is behind and
+            # at the idle rate while nothing changed (unless every acquisition is accumulated)
+            delay = self.scheduler.poll(display_behind=self.frames.pending, continuous=self.persistence is not None)
+            if delay:
+                return delay
+            self._job = self.acquire_steps(snapshot)
+            self._job_time = 0.0
+
+        # Every frame is a new acquisition continuing the signal stream, generated one chunk
+        # per step, so that the pool interleaves the channels and a change cancels it early.
+        tic = time.perf_counter()
+        done = next(self._job)
+        self._job_time += time.perf_counter() - tic
+        if done < snapshot.points:
+            return 0.0
+        self._job = None
+        self.latency.record(self.waveform, snapshot.memory_depth, snapshot.timebase, snapshot.points, self._job_time)
+        self.persist(snapshot)
+        # A notification still pending covers the new frame too (the older one is dropped).
+        if self.publish(snapshot.time_axis, snapshot.points, snapshot):
+            self.frame_ready.emit(self.channel, self.frames)
+        return 0.0
+
+    def run(self):
+        """Step the generator in the calling thread until it is stopped (without a pool)."""
+        while (delay := self.step()) is not None:
+            self.scheduler.sleep(delay)
+        self.close()
 
+    def stop(self):
+        self.running = False
+        self.scheduler.notify_change()  # end a wait
+
+    def close(self):
+        """Release the resources once no step runs anymore."""
+        if self._job is not None:
+            self._job.close()
+            self._job = None
+        logging.debug(
+            f"Channel {self.channel} frames: {self.frames.stats()}, scheduler: {self.scheduler.stats()}, "
+            f"aborted acquisitions: {self.aborted_jobs}"
+        )
         self.finished.emit()
-        self.stop()
+
+    def is_running(self):
+        return self.running
+
+
+class BatchedSignalGenerator(SignalGenerator):
+    """One generator for all the channels it acquires: every frame holds one row per channel
+    over the shared time axis, generated in a single pass (see `signal_generator.batched`).
+    Its memory depth is divided between the channels."""
+
+    def __init__(self, parent, channel, connector_state, *args, **kwargs):
+        super().__init__(parent, BATCH, connector_state, *args, **kwargs)
+        initial = self.parameters.current
+        self.parameters = ParameterStore(
+            BatchParameters(
+                timebase=initial.timebase,
+                trigger_delay=initial.trigger_delay,
+                connector_state=True,
+                memory_depth=initial.memory_depth,
+                channels=(channel,),
+                connector_states=(connector_state,),
+            )
+        )
+        self.snapshot = self.parameters.current
+        self._synthesized_channels: tuple = ()
+
+    @property
+    def channels(self) -> tuple:
+        return self.parameters.current.channels  # type: ignore
+
+    def add_channel(self, channel: int, connector_state: bool):
+        snapshot: BatchParameters = self.parameters.current  # type: ignore
+        self.parameters.update(
+            channels=snapshot.channels + (channel,), connector_states=snapshot.connector_states + (connector_state,)
+        )
+        self.scheduler.notify_change()
+
+    def remove_channel(self, channel: int):
+        snapshot: BatchParameters = self.parameters.current  # type: ignore
+        keep = [i for i, c in enumerate(snapshot.channels) if c != channel]
+        self.parameters.update(
+            channels=tuple(snapshot.channels[i] for i in keep),
+            connector_states=tuple(snapshot.connector_states[i] for i in keep),
+        )
+        self.scheduler.notify_change()
+
+    def update_channel_connector_state(self, channel: int, connector_state: bool):
+        """Receive signal that the connector of `channel` is (un)plugged."""
+        snapshot: BatchParameters = self.parameters.current  # type: ignore
+        states = tuple(
+            connector_state if c == channel else state for c, state in zip(snapshot.channels, snapshot.connector_states)
+        )
+        self.parameters.update(connector_states=states)
+        self.scheduler.notify_change()
+
+    def setup(self, snapshot: BatchParameters | None = None):
+        """Create the synthesizer of the channels of `snapshot` (of the current batch by default)."""
+        if isdebug:
+            debugpy.debug_this_thread()
+        snapshot = snapshot or self.parameters.current  # type: ignore
+        # TEST VALUES
+        self.noise_std_dev = 0.01
+        configs = [
+            {
+                "waveform": self.waveform,
+                "freq": 50e6,
+                "phase": np.pi / 2 if channel == 2 else 0,
+                "noise_std_dev": self.noise_std_dev,
+                "pulse_width": 1e-9,
+                "repetition_rate": 88e6,
+            }
+            for channel in snapshot.channels  # type: ignore
+        ]
+        # END OF TEST VALUES
+        self.synthesizer = BatchedSynthesizer(configs, noise_bank=self.noise_bank)  # type: ignore
+        self._synthesized_channels = snapshot.channels  # type: ignore
+
+    def _rows(self, snapshot: BatchParameters, n: int) -> NDArray:
+        """(channels x n) view of the back frame, synthesizer ready for the channels."""
+        if snapshot.channels != self._synthesized_channels:
+            self.setup(snapshot)
+        return self.frames.back().data[: len(snapshot.channels) * n].reshape(len(snapshot.channels), n)
+
+    def acquire_steps(self, snapshot: BatchParameters):  # type: ignore
+        out = self._rows(snapshot, snapshot.points)
+        return self.synthesizer.acquire_steps(out, snapshot.time_axis, snapshot.connector_states)  # type: ignore
+
+    def preview(self, snapshot: BatchParameters) -> bool:  # type: ignore
+        factor = max(1, -(-snapshot.points // PREVIEW_POINTS))
+        t = snapshot.time_axis[::factor]
+        self.synthesizer.acquire(self._rows(snapshot, len(t)), t, snapshot.connector_states)  # type: ignore
+        return self.publish(t, len(t), snapshot)
+
+    def persist(self, snapshot: BatchParameters):  # type: ignore
+        if self.persistence is not None:
+            for channel, row in zip(snapshot.channels, self._rows(snapshot, snapshot.points)):
+                self.persistence.accumulate(channel, snapshot.time_axis, row)
+
+    def publish(self, t: TimeAxis, n: int, snapshot: BatchParameters) -> bool:  # type: ignore
+        return self.frames.publish(t, n, channels=snapshot.channels)
+
+
+class ProcessSignalGenerator(QObject):
+    """Drop-in replacement of `SignalGenerator` that generates in a worker process
+    (see `signal_generator.process_backend`). It only forwards the knob changes and,
+    stepped by the pool, turns the frame-ready notifications into `progress` signals."""
+
+    finished = pyqtSignal()
+    progress = pyqtSignal(object, object, object)  # channel, t, wfm
+
+    def __init__(self, parent, channel, connector_state, *args, waveform="sine", **kwargs):
+        super().__init__()
+        self.parent = parent
+        self.running = True
+        self.channel = channel
+        self.timebase: Decimal = get_current_timebase(self.parent)
+        self.trigger_delay: Decimal = get_current_delay(self.parent, self.timebase)
+        self.sequence = 0  # of the last received frame
+        self.started = False
+        self.persistence = None  # see SignalGenerator.persist()
+
+        # TEST VALUES
+        phase = np.pi / 2 if channel == 2 else 0
+        # END OF TEST VALUES
+
+        self.generator = GeneratorProcess(
+            _get_mem_depth_per_channel(1),
+            self.timebase,
+            self.trigger_delay,
+            connector_state,
+            seed=kwargs.get("seed", None),
+            waveform=waveform,
+            freq=50e6,
+            phase=phase,
+            noise_std_dev=kwargs.get("noise_std_dev", 0.01),
+            pulse_width=1e-9,
+            repetition_rate=88e6,
+            dds=kwargs.get("dds", True),
+        )
+
+    @pyqtSlot(Decimal)
+    def update_timebase(self, timebase: Decimal):
+        self.timebase = timebase
+        self.generator.send("timebase", timebase)
+
+    @pyqtSlot(bool)
+    def update_connector_state(self, connector_state: bool):
+        self.generator.send("connector_state", connector_state)
+
+    @pyqtSlot(Decimal)
+    def update_trigger_delay(self, delay: Decimal):
+        self.trigger_delay = delay
+        self.generator.send("trigger_delay", delay)
+
+    def step(self) -> float | None:
+        """Forward the next frame of the worker process, if there is one."""
+        if not self.running:
+            return None
+        if not self.started:
+            self.generator.start()  # spawning takes a while, so in the worker, not in the GUI
+            self.started = True
+        frame = self.generator.next_frame(timeout=0)
+        if frame is None:
+            return POLL_INTERVAL / 10
+        self.sequence, t, view = frame
+        # The slot of the ring is written again by the worker two frames later, while the
+        # display may still hold this frame: hand out a copy, not the shared memory
+        wfm = view.copy()
+        if self.persistence is not None:
+            self.persistence.accumulate(self.channel, t, wfm)
+        self.progress.emit(self.channel, t, wfm)
+        return 0.0
+
+    def run(self):
+        """Forward the frames of the worker process until stopped (without a pool)."""
+        while (delay := self.step()) is not None:
+            time.sleep(delay)
+        self.close()
+
+    def hold(self, held: bool):
+        """Pause (True) or resume (False) the acquisitions of the worker process."""
+        self.generator.send("hold", held)
 
     def stop(self):
         self.running = False
+        self.generator.stop_event.set()
+
+    def close(self):
+        """Stop the worker process and release the shared memory (no step runs anymore)."""
+        self.generator.stop()
+        self.finished.emit()
 
     def is_running(self):
         return self.running
@@ -749,7 +1083,63 @@ if __name__ == "__main__":
     mem_depth = 1400  # number of datapoints in memory
     N_TDIV = 10  # number of horizontal divisions
     N_VDIV = 10  # number of vertical divisions
-    
+
+    # Benchmark of the pulse train paths (1.4 Mpts memory, 1 ns pulses at 88 MHz)
+    mem_depth = 1_400_000
+    for tb_bench in [Decimal("1E-5"), Decimal("1E-4"), Decimal("1E-3")]:
+        t = _generate_time_axis(tb_bench, 1)
+        dt_sample = t.dt
+        pulse_shape = sampled_pulse_shape(dt_sample, 1e-9)
+        num_pulses = int(np.ceil(float(tb_bench) * N_TDIV * 88e6)) | 1
+        center_indices = _get_center_indices(t, num_pulses, 88e6)
+
+        tic = time.perf_counter()
+        looped = scatter_pulses_loop(np.zeros(len(t), dtype=_dtype), center_indices, pulse_shape)
+        toc = time.perf_counter()
+        vectorised = scatter_pulses(np.zeros(len(t), dtype=_dtype), center_indices, pulse_shape)
+        toc2 = time.perf_counter()
+        _generate_pulse_train_convolution(tb_bench, 0.0, 1, 1e-9, 88e6)
+        toc3 = time.perf_counter()
+        print(
+            f"{tb_bench} s/div, {num_pulses} pulses: loop {(toc - tic) * 1e3:.1f} ms, "
+            f"vectorised {(toc2 - toc) * 1e3:.1f} ms (identical: {np.array_equal(looped, vectorised)}), "
+            f"convolution {(toc3 - toc2) * 1e3:.1f} ms, "
+            f"planner: {get_planner().choose(num_pulses, len(pulse_shape), len(t))}"
+        )
+    mem_depth = 1400
+
+    # Benchmark of the acquisition path of the generators (chunks of the synthesizers into the
+    # back frame, as SignalGenerator.acquire_steps() and BatchedSignalGenerator run them)
+    def best_time(steps, repeats=3) -> float:
+        """Shortest time [ms] to exhaust `steps()` after a warm-up run."""
+        timings = []
+        for _ in range(repeats):
+            tic = time.perf_counter()
+            for _ in steps():
+                pass
+            timings.append(time.perf_counter() - tic)
+        return min(timings[1:]) * 1e3
+
+    full_depth = 14_000_000
+    frames = TripleBuffer(full_depth, dtype=_dtype)
+    synth_kwargs = dict(freq=50e6, noise_std_dev=0.01, pulse_width=1e-9, repetition_rate=88e6)
+    for w in ["sine", "pulse_train"]:
+        for tb_bench in [Decimal("1E-5"), Decimal("1E-4"), Decimal("1E-3")]:
+            timings = []
+            points = get_acquired_points(tb_bench, full_depth)
+            t = TimeAxis.from_timebase(tb_bench, points)
+            for dds in [True, False] if w == "sine" else [False]:
+                synthesizer = StreamingSynthesizer(w, dds=dds, **synth_kwargs)
+                elapsed = best_time(lambda: synthesizer.acquire_steps(frames.back().data[:points], t.t0, t.dt))
+                timings.append(f"{'DDS ' if dds else ''}{elapsed:.1f} ms")
+
+            points = get_acquired_points(tb_bench, full_depth // 2)
+            t = TimeAxis.from_timebase(tb_bench, points)
+            batched = BatchedSynthesizer([{"waveform": w, "phase": np.pi / 2 * c, **synth_kwargs} for c in range(2)])
+            rows = frames.back().data[: 2 * points].reshape(2, points)
+            timings.append(f"batched 2 x {points}: {best_time(lambda: batched.acquire_steps(rows, t)):.1f} ms")
+            print(f"Acquisition of {w} at {tb_bench} s/div: {', '.join(timings)}")
+
     for w in available_waveforms:
         if w == "sine":
             tic = time.time_ns()
@@ -758,7 +1148,7 @@ if __name__ == "__main__":
             print(f"Calculation took {(toc-tic)*1E-6} ms")
             if result:
                 t, wfm, noise = result
-                line, = plt.plot(t, wfm, lw=1, antialiased=True)
+                line, = plt.plot(as_array(t), wfm, lw=1, antialiased=True)
                 toc2 = time.time_ns()
                 print(f"Plotting took {(toc2-toc)*1E-6} ms")
                 t, wfm, noise = _re_noise(*result, noise_std_dev=.01)
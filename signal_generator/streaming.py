@@ -0,0 +1,256 @@
+"""Phase-continuous streaming synthesis of the acquired signals.
+
+Instead of regenerating the whole acquisition memory at once, the
+`StreamingSynthesizer` keeps a phase accumulator for its channel and fills
+the memory in fixed-size blocks. Every acquisition continues the signal
+where the previous one ended (each one starts at the next trigger event),
+so the working set is bounded by the block size, not by the memory depth."""
+
+import logging
+
+import numpy as np
+from numpy.typing import NDArray
+
+from signal_generator.dds import DDSOscillator, dds_waveforms
+from signal_generator.kernels import sine_block
+from signal_generator.noise import NoiseBank, get_noise_bank
+from signal_generator.planner import get_planner
+from signal_generator.pulses import phase_indices, pulse_peak, sampled_pulse_table, scatter_pulses, scatter_pulses_loop
+
+BLOCK_SIZE = 1 << 16  # samples synthesized per block (fits in L2 with its temporaries)
+CHUNK_SIZE = 1 << 20  # samples per step of a cancellable acquisition (a few ms of work)
+PREVIEW_POINTS = 1400  # points of a preview (as many as the display plots)
+
+streamable_waveforms = ["sine", "square", "triangle", "sawtooth", "pulse_train", "pulse_train_conv"]
+
+
+class StreamingSynthesizer:
+    """Block-wise synthesizer of a single channel with a resumable phase accumulator.
+
+    The phase is kept in cycles (wrapped to [0, 1) in float64), so it does not lose
+    precision no matter how long the stream runs."""
+
+    def __init__(
+        self,
+        waveform="sine",
+        freq=50e6,
+        phase=0.0,
+        noise_std_dev=0.0,
+        block_size: int = BLOCK_SIZE,
+        pulse_width=1e-9,
+        repetition_rate=1e3,
+        width=1,
+        noise_bank: NoiseBank | None = None,
+        dds: bool = False,
+    ):
+        if waveform not in streamable_waveforms:
+            raise ValueError(f"Unsupported waveform {waveform}")
+        self.waveform = waveform
+        self.phase = float(phase)  # [rad] at the trigger point (t = 0)
+        self.noise_std_dev = float(noise_std_dev)
+        self.pulse_width = float(pulse_width)
+        self.width = 0.5 if waveform == "triangle" else float(width)
+        self.block_size = int(block_size)
+
+        # Pulse trains repeat at the repetition rate
+        self.freq = float(repetition_rate if waveform.startswith("pulse_train") else freq)
+        self._pulse_train = waveform.startswith("pulse_train")
+        self._pulse_peak = pulse_peak(self.pulse_width) if self._pulse_train else 1.0
+        self._pulse_shape: tuple[float, NDArray] | None = None  # (dt, normalized sampled shape table)
+        self._pulse_strategy: tuple[tuple, str] | None = None  # ((dt, block), strategy of the planner)
+
+        self._noise_bank = noise_bank if noise_bank is not None else get_noise_bank()
+
+        # Wavetable oscillator replaces the evaluation of the shape (periodic waveforms only)
+        self._dds = (
+            DDSOscillator(waveform, width=self.width, block_size=self.block_size)
+            if dds and waveform in dds_waveforms
+            else None
+        )
+
+        # RESUMABLE STATE
+        self.cycles = 0.0  # fractional phase of the next sample [cycles]
+        self.elapsed = 0.0  # stream time of the next sample [s]
+        self.acquisitions = 0
+
+        # BLOCK SCRATCH BUFFERS (allocated once)
+        self._ramp = np.arange(self.block_size, dtype=np.float64)
+        self._cycles_block = np.empty(self.block_size, dtype=np.float64)
+        self._noise_block = np.empty(self.block_size, dtype=np.float32)
+        # Pulse centers of a block (grown to the most pulses a block had)
+        self._pulse_ramp = np.empty(0, dtype=np.float64)
+        self._pulse_positions = np.empty(0, dtype=np.float64)
+        self._centers_block = np.empty(0, dtype=np.int64)
+        self._rows_block = np.empty(0, dtype=np.intp)
+
+    def rearm(self, t_start: float):
+        """Wait for the next trigger event and position the accumulator at the first
+        sample of the acquisition, which starts `t_start` seconds from the trigger."""
+        # Phase the first sample must have for the trigger to happen at t = 0
+        target = (self.phase / (2 * np.pi) + self.freq * t_start) % 1.0
+        wait = (target - self.cycles) % 1.0
+        if self.freq:
+            self.elapsed += wait / self.freq
+        self.cycles = target
+
+    def advance(self, duration: float):
+        """Let the signal run for `duration` seconds without acquiring it (dead time)."""
+        self.cycles = (self.cycles + self.freq * duration) % 1.0
+        self.elapsed += duration
+
+    def fill(self, out: NDArray, dt: float, connector_state: bool = True) -> NDArray:
+        """Continue the stream into `out`, one block at a time, sampled every `dt` seconds."""
+        for _ in self.fill_steps(out, dt, connector_state, chunk_size=max(1, len(out))):
+            pass
+        return out
+
+    def fill_steps(self, out: NDArray, dt: float, connector_state: bool = True, chunk_size: int = CHUNK_SIZE):
+        """`fill()` as a generator yielding the number of samples done after every chunk of
+        `chunk_size` samples. Not resuming it cancels the rest of the fill (the stream simply
+        continues from the last complete chunk)."""
+        n = len(out)
+        step = self.freq * dt  # cycles per sample
+        if self._dds is not None:
+            self._dds.cycles = self.cycles
+
+        for start in range(0, n, self.block_size):
+            stop = min(start + self.block_size, n)
+            m = stop - start
+            out_block = out[start:stop]
+
+            # The noise of a block is drawn first, so the sine kernel can add it in its pass
+            noise = None
+            if self.noise_std_dev:
+                noise = self._noise_block[:m]
+                self._noise_bank.fill(noise, self.noise_std_dev, refresh=False)
+
+            if connector_state and self._dds is not None:
+                self._dds.fill(out_block, self.freq, dt)
+            elif connector_state and self.waveform == "sine":
+                sine_block(out_block, noise, 2 * np.pi * self.cycles, 2 * np.pi * step)
+                noise = None  # added
+            elif connector_state and self._pulse_train:
+                self._render_pulses(out_block, self.cycles, step, dt)
+            elif connector_state:
+                cycles = self._cycles_block[:m]
+                np.multiply(self._ramp[:m], step, out=cycles)
+                cycles += self.cycles
+                self._shape(cycles, out_block, dt)
+            else:
+                out_block.fill(0)
+
+            if noise is not None:
+                np.add(out_block, noise, out=out_block)
+
+            self.cycles = (self.cycles + m * step) % 1.0
+            self.elapsed += m * dt
+            if stop < n and stop // chunk_size != start // chunk_size:
+                yield stop
+
+        if self._dds is not None and connector_state:
+            self.cycles = self._dds.cycles  # the integer accumulator is exact
+        if self.noise_std_dev:
+            self._noise_bank.refresh()
+        self.acquisitions += 1
+        yield n
+
+    def acquire(self, out: NDArray, t_start: float, dt: float, connector_state: bool = True) -> NDArray:
+        """Capture the next triggered acquisition of the stream into `out`."""
+        if connector_state:
+            self.rearm(t_start)
+        return self.fill(out, dt, connector_state)
+
+    def acquire_steps(
+        self, out: NDArray, t_start: float, dt: float, connector_state: bool = True, chunk_size: int = CHUNK_SIZE
+    ):
+        """`acquire()` in cancellable chunks (see `fill_steps()`)."""
+        if connector_state:
+            self.rearm(t_start)
+        return self.fill_steps(out, dt, connector_state, chunk_size)
+
+    def preview(self, out: NDArray, t_start: float, dt: float, connector_state: bool = True) -> NDArray:
+        """Decimated pass of the next acquisition: `out` is sampled every `dt` seconds, i.e.
+        the acquisition interval times the decimation factor (e.g. the points the display plots).
+        The stream is left where it was, the full acquisition follows as usual."""
+        state = self.cycles, self.elapsed, self.acquisitions
+        self.acquire(out, t_start, dt, connector_state)
+        self.cycles, self.elapsed, self.acquisitions = state
+        return out
+
+    def _shape(self, cycles: NDArray, out_block: NDArray, dt: float):
+        """Evaluate the waveform at the given phases (in cycles, modified in place)."""
+        match self.waveform:
+            case "sine":
+                cycles *= 2 * np.pi
+                np.sin(cycles, out=cycles)
+                out_block[:] = cycles
+            case "square":
+                np.mod(cycles, 1.0, out=cycles)
+                out_block[:] = 1 - 2 * (cycles >= 0.5)
+            case "sawtooth" | "triangle":
+                np.mod(cycles, 1.0, out=cycles)
+                w = self.width
+                if w >= 1:
+                    out_block[:] = 2 * cycles - 1
+                elif w <= 0:
+                    out_block[:] = 1 - 2 * cycles
+                else:
+                    out_block[:] = np.where(cycles < w, 2 * cycles / w - 1, 1 - 2 * (cycles - w) / (1 - w))
+            case "pulse_train" | "pulse_train_conv":
+                self._render_pulses(out_block, float(cycles[0]), self.freq * dt, dt)
+            case _:
+                logging.debug("Unsupported waveform.")
+                out_block.fill(0)
+
+    def _render_pulses(self, out_block: NDArray, start_cycles: float, step: float, dt: float):
+        """Write the sampled pulse shape at the pulses of the block (first sample at the phase
+        `start_cycles`, `step` cycles per sample) instead of evaluating it at every sample.
+        The pulses are centered at the integer cycles (to 1/PULSE_PHASES of a sample)."""
+        if self._pulse_shape is None or self._pulse_shape[0] != dt:
+            table = sampled_pulse_table(dt, self.pulse_width) / self._pulse_peak
+            self._pulse_shape = (dt, table.astype(out_block.dtype))
+        table = self._pulse_shape[1]
+        half = table.shape[1] // 2
+        m = len(out_block)
+
+        # Pulses centered within half a window (and the rounding) of the block
+        first = int(np.ceil(start_cycles - (half + 1) * step))
+        last = int(np.floor(start_cycles + (m + half + 1) * step))
+        count = max(0, last - first + 1)
+        if len(self._centers_block) < count:
+            self._pulse_ramp = np.arange(count, dtype=np.float64)
+            self._pulse_positions = np.empty(count, dtype=np.float64)
+            self._centers_block = np.empty(count, dtype=np.int64)
+            self._rows_block = np.empty(count, dtype=np.intp)
+        # Fractional sample of every center: (cycle - start_cycles) / step
+        positions = self._pulse_positions[:count]
+        np.add(self._pulse_ramp[:count], first - start_cycles, out=positions)
+        positions /= step
+        centers, rows = self._centers_block[:count], self._rows_block[:count]
+        phase_indices(positions, centers, rows)
+
+        out_block.fill(0)
+        if self._pulse_strategy is None or self._pulse_strategy[0] != (dt, m):
+            estimates = get_planner().estimate(count, table.shape[1], m)
+            self._pulse_strategy = ((dt, m), min(("loop", "scatter"), key=estimates.get))  # type: ignore
+        if self._pulse_strategy[1] == "scatter":
+            scatter_pulses(out_block, centers, table, rows)
+        else:
+            scatter_pulses_loop(out_block, centers, table, rows)
+
+if __name__ == "__main__":
+    import time
+
+    n = 14_000_000
+    time_range = 10e-6
+    dt = time_range / n
+    out = np.empty(n, dtype=np.float32)
+
+    for w in streamable_waveforms:
+        for dds in [False, True] if w in dds_waveforms else [False]:
+            synth = StreamingSynthesizer(w, freq=50e6, noise_std_dev=0.01, repetition_rate=88e6, dds=dds)
+            tic = time.perf_counter()
+            for _ in range(3):
+                synth.acquire(out, -time_range / 2, dt)
+            toc = time.perf_counter()
+            print(f"{w}{' (DDS)' if dds else ''}: {(toc - tic) / 3 * 1e3:.1f} ms per acquisition of {n} points")
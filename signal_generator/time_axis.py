@@ -0,0 +1,104 @@
+"""Implicit (affine) time axis of an acquisition.
+
+The timepoints of every frame are `t0 + k*dt` for k in [0, n). Carrying the
+three numbers instead of an n-point array saves a third of the acquisition
+memory of a channel and all of the copying of the time array; the samples
+are materialised only for the consumers that really need an array (e.g.
+the plotted points after decimation)."""
+
+from dataclasses import dataclass, replace
+from decimal import Decimal
+from functools import lru_cache
+
+import numpy as np
+from numpy.typing import ArrayLike, NDArray
+
+from signal_generator import N_TDIV
+
+BLOCK_SIZE = 1 << 14  # samples materialised per block (128 kB float64 temporary)
+
+
+@lru_cache(maxsize=None)
+def _get_ramp(n: int) -> NDArray:
+    ramp = np.arange(n, dtype=np.float64)
+    ramp.flags.writeable = False
+    return ramp
+
+
+@dataclass(frozen=True)
+class TimeAxis:
+    t0: float  # time of the first sample [s] (relative to the trigger)
+    dt: float  # sample interval [s]
+    n: int  # number of samples
+
+    @classmethod
+    def from_timebase(cls, timebase: Decimal, n: int, delay: Decimal = Decimal(0)) -> "TimeAxis":
+        """Axis of `n` samples over the screen (`N_TDIV` divisions) shifted by the trigger delay.
+        Same grid as `linspace(-T/2, T/2, n, endpoint=False) - delay`, in float64."""
+        time_range = float(Decimal(timebase) * Decimal(N_TDIV))
+        return cls(-time_range / 2 - float(delay), time_range / int(n), int(n))
+
+    def __len__(self) -> int:
+        return self.n
+
+    @property
+    def shape(self) -> tuple[int]:
+        return (self.n,)
+
+    @property
+    def t_end(self) -> float:
+        """Time just after the last sample (t0 + n*dt)."""
+        return self.t0 + self.n * self.dt
+
+    def __getitem__(self, key):
+        """`axis[k]` is the time of the k-th sample, `axis[start:stop:step]` is a sub-axis."""
+        if isinstance(key, slice):
+            start, _, step = key.indices(self.n)
+            count = len(range(*key.indices(self.n)))
+            return TimeAxis(self.t0 + start * self.dt, self.dt * step, count)
+        k = int(key)
+        if k < 0:
+            k += self.n
+        if not 0 <= k < self.n:
+            raise IndexError(f"Sample {key} out of the axis of {self.n} samples.")
+        return self.t0 + k * self.dt
+
+    def time(self, index: ArrayLike) -> float | NDArray:
+        """Time of the sample(s) at `index` (no bounds check)."""
+        t = self.t0 + np.asarray(index, dtype=np.float64) * self.dt
+        return float(t) if t.ndim == 0 else t
+
+    def index(self, time: ArrayLike) -> int | NDArray:
+        """Index of the first sample at or after `time`, clipped to [0, n].
+        Same as `np.searchsorted(axis.materialize(), time, side="left")` without the array."""
+        k = np.clip(np.ceil((np.asarray(time, dtype=np.float64) - self.t0) / self.dt), 0, self.n).astype(np.int64)
+        return int(k) if k.ndim == 0 else k
+
+    def shift(self, delay: float | Decimal) -> "TimeAxis":
+        """The same axis delayed by `delay` seconds (t -> t - delay)."""
+        return replace(self, t0=self.t0 - float(delay))
+
+    def affine(self, out: NDArray, scale: float = 1.0, offset: float = 0.0) -> NDArray:
+        """Write `scale * t + offset` into `out`, block by block in float64 (e.g. the phase
+        2*pi*freq*t + phase). Only a block-sized temporary is needed."""
+        ramp = _get_ramp(min(BLOCK_SIZE, self.n))
+        block = np.empty_like(ramp)
+        step = scale * self.dt
+        for start in range(0, self.n, BLOCK_SIZE):
+            stop = min(start + BLOCK_SIZE, self.n)
+            b = block[: stop - start]
+            np.multiply(ramp[: stop - start], step, out=b)
+            np.add(b, scale * (self.t0 + start * self.dt) + offset, out=b)
+            out[start:stop] = b
+        return out
+
+    def materialize(self, out: NDArray | None = None, dtype=np.float32) -> NDArray:
+        """The timepoints as an array (written into `out` if given)."""
+        if out is None:
+            out = np.empty(self.n, dtype=dtype)
+        return self.affine(out)
+
+
+def as_array(t: "TimeAxis | NDArray") -> NDArray:
+    """Timepoints as an array, materialising them if `t` is a `TimeAxis`."""
+    return t.materialize() if isinstance(t, TimeAxis) else t
@@ -0,0 +1,142 @@
+"""Bounded pool of threads stepping the signal generators.
+
+Instead of one thread per channel spinning in its own loop, every generator
+exposes `step()`: one unit of work (e.g. one acquisition) that returns how
+many seconds to wait before the next step, or None once it is done. A fixed
+number of workers (the CPU count by default) picks the generator that is due
+first from a deadline heap, so 4 or 8 channels share the same few threads and
+a generator that is waiting costs nothing."""
+
+import heapq
+import itertools
+import logging
+import os
+import threading
+import time
+from typing import Protocol
+
+
+class Steppable(Protocol):
+    def step(self) -> float | None: ...
+
+
+class GeneratorPool:
+    """Deadline-ordered scheduling of steppable generators on at most `max_workers` threads.
+
+    A generator is stepped by one worker at a time. `wake()` makes it due
+    immediately (e.g. after a change of its parameters), `remove()` waits
+    until its running step is over."""
+
+    def __init__(self, max_workers: int | None = None):
+        self.max_workers = max(1, max_workers if max_workers is not None else (os.cpu_count() or 1))
+        self._condition = threading.Condition()
+        self._heap: list[tuple[float, int, Steppable]] = []
+        self._order = itertools.count()  # tie-breaker of equal deadlines (generators do not compare)
+        self._members: set[Steppable] = set()
+        self._entries: dict[Steppable, int] = {}  # generator -> order of its only valid heap entry
+        self._busy: set[Steppable] = set()
+        self._workers: list[threading.Thread] = []
+        self._shutdown = False
+
+        # COUNTERS
+        self.steps = 0
+
+    def __len__(self) -> int:
+        return len(self._members)
+
+    def _push(self, generator: Steppable, deadline: float):
+        order = next(self._order)
+        self._entries[generator] = order
+        heapq.heappush(self._heap, (deadline, order, generator))
+        self._condition.notify()
+
+    def submit(self, generator: Steppable):
+        """Start stepping `generator` (its first step is due now)."""
+        with self._condition:
+            if self._shutdown:
+                raise RuntimeError("The generator pool is shut down.")
+            self._members.add(generator)
+            self._push(generator, time.perf_counter())
+            # One more worker while there are fewer workers than generators
+            if len(self._workers) < min(self.max_workers, len(self._members)):
+                worker = threading.Thread(target=self._work, name=f"generator-{len(self._workers)}", daemon=True)
+                self._workers.append(worker)
+                worker.start()
+
+    def wake(self, generator: Steppable):
+        """Make the next step of `generator` due now (no-op for generators not in the pool)."""
+        with self._condition:
+            if generator in self._members:
+                self._push(generator, time.perf_counter())
+
+    def remove(self, generator: Steppable):
+        """Stop stepping `generator`, waiting for its current step to finish."""
+        with self._condition:
+            self._members.discard(generator)
+            self._entries.pop(generator, None)
+            while generator in self._busy:
+                self._condition.wait()
+
+    def _work(self):
+        while True:
+            with self._condition:
+                generator = self._next_due()
+                if generator is None:
+                    return
+                del self._entries[generator]
+                self._busy.add(generator)
+
+            try:
+                delay = generator.step()
+            except Exception:
+                logging.exception("Signal generator step failed, removing it from the pool.")
+                delay = None
+            self.steps += 1
+
+            with self._condition:
+                self._busy.discard(generator)
+                if delay is None:
+                    self._members.discard(generator)
+                    self._entries.pop(generator, None)
+                elif generator in self._members:
+                    # Woken up during the step (its entry was skipped meanwhile): due now
+                    woken = generator in self._entries
+                    self._push(generator, time.perf_counter() + (0.0 if woken else delay))
+                self._condition.notify_all()  # remove() may be waiting
+
+    def _next_due(self) -> Steppable | None:
+        """Pop stale heap entries and wait until the earliest valid one is due (under the lock)."""
+        while not self._shutdown:
+            if not self._heap:
+                self._condition.wait()
+                continue
+            deadline, order, generator = self._heap[0]
+            if self._entries.get(generator) != order or generator in self._busy:
+                heapq.heappop(self._heap)  # replaced, removed or being stepped (rescheduled after the step)
+                continue
+            now = time.perf_counter()
+            if deadline > now:
+                self._condition.wait(deadline - now)
+                continue
+            heapq.heappop(self._heap)
+            return generator
+        return None
+
+    def shutdown(self):
+        with self._condition:
+            self._shutdown = True
+            self._condition.notify_all()
+        for worker in self._workers:
+            worker.join()
+        self._workers.clear()
+
+
+_generator_pool: GeneratorPool | None = None
+
+
+def get_generator_pool() -> GeneratorPool:
+    """Process-wide pool of the generator workers (created on first use)."""
+    global _generator_pool
+    if _generator_pool is None:
+        _generator_pool = GeneratorPool()
+    return _generator_pool
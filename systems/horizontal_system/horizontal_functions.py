@@ -2,7 +2,7 @@ from decimal import Decimal
 import logging
 
 from . import available_timebases
-from signal_generator import N_TDIV
+from signal_generator import MAX_SAMPLE_RATE, N_TDIV
 
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
@@ -35,6 +35,18 @@ def relim_and_update_chart(self, timebase=None, delay=None):
         new_xlim = calculate_chart_xlimit(self, timebase=timebase, delay=delay)
         self.canvas.update_chart(xlim=new_xlim)
 
+def get_sample_rate(timebase: Decimal, memory_depth: int) -> float:
+    """Real-time sample rate [Sa/s] at the timebase: the memory depth spread over the
+    waveform length (Memory depth = sample rate × s/div × div), at most the maximum
+    real-time sample rate of the ADC (see `select_sampling_mode`)."""
+    return min(MAX_SAMPLE_RATE, float(memory_depth) / float(timebase * N_TDIV))
+
+def get_acquired_points(timebase: Decimal, memory_depth: int) -> int:
+    """Number of points actually acquired over the screen at the timebase (never more
+    than the memory depth). At fast timebases the display interpolates between them."""
+    points = round(get_sample_rate(timebase, memory_depth) * float(timebase * N_TDIV))
+    return max(2, min(int(memory_depth), points))
+
 def get_current_delay(self: "Oscilloscope", timebase: Decimal) -> Decimal:  # type: ignore # noqa: F821
     timerange = timebase * Decimal(N_TDIV)
     
@@ -174,4 +186,4 @@ def use_zoom_function(self):
     To change the time base of the normal window, turn off Zoom; then, turn the **Horizontal 
     Scale Knob**. 
     """
-    pass
\ No newline at end of file
+    logging.info("The zoom window is not available: the display shows the normal window only.")
\ No newline at end of file
@@ -2,7 +2,7 @@ import logging
 
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
-def run_control(self):
+def run_control(self, stopped: bool):
     """Press the **Run/Stop** or **Single** button on the front panel to run or stop the sampling 
     system of the scope. 
     * When the **Run/Stop** button is green, the oscilloscope is running, that is, acquiring data 
@@ -25,7 +25,8 @@ def run_control(self):
     stopped (the **Run/Stop** button is illuminated in red). 
     
     Press **Single** again to acquire another waveform"""
-    pass
+    logging.debug(f"Acquisition {'stopped' if stopped else 'running'}")
+    self.signalmanager.hold_acquisition(stopped)
 
 def select_memory_depth(self):
     """Memory depth refers to the number of waveform points that the oscilloscope can store in a 
@@ -3,12 +3,20 @@ import logging
 from PyQt5 import QtWidgets
 
 from front_panel.custom_widgets.offset_indicators import VerticalOffsetIndicator
-from signal_generator import N_VDIV, DIAL_PREC_FACT
+from signal_generator import N_ANALOG_CHANNELS, N_VDIV, DIAL_PREC_FACT
 
 from . import available_scales
 # logging.basicConfig(level=logging.DEBUG, format='%(asctime)s - %(levelname)s - %(message)s')
 
 
+def _analog_channels(self) -> tuple[int, ...]:
+    """Channels with a vertical system: the analog channels of the signal source registry."""
+    signalmanager = getattr(self, "signalmanager", None)
+    if signalmanager is None:  # before the registry exists
+        return tuple(range(1, N_ANALOG_CHANNELS + 1))
+    return signalmanager.sources
+
+
 def enable_channel(self, channel: int, state: bool):
     """The oscilloscope provides 2 analog input channels (CH1, CH2) and provides independent
     vertical control system for each channel. As the vertical system setting methods of both
@@ -25,7 +33,7 @@ def enable_channel(self, channel: int, state: bool):
     After the channel is turned on, modify the parameters such as the vertical scale, the
     horizontal time base and the trigger mode according to the input signal to make the
     waveform display easy to observe and measure."""
-    if channel in [1, 2]:
+    if channel in _analog_channels(self):
         channel_obj = getattr(self, f"channel{channel}")
         connector_state = getattr(self, f"channel{channel}_connector").isChecked()
         channel_obj.Enabled = state
@@ -34,7 +42,7 @@ def enable_channel(self, channel: int, state: bool):
         else:
             getattr(self.canvas, f"channel{channel}_offset_indicator").hide()
     else:
-        logging.error("Invalid channel number. Accepts 1 and 2 only.")
+        logging.error(f"Invalid channel number {channel}. Accepts {', '.join(map(str, _analog_channels(self)))} only.")
         return
 
     if state:
@@ -52,8 +60,8 @@ def calculate_chart_ylimits(scale: Decimal, offset_data: Decimal) -> tuple[float
 
 
 def get_current_scale(self: "Oscilloscope", channel: int) -> Decimal:  # type: ignore # noqa: F821
-    if channel in [1, 2]:
-        dial = self.channel1var_dial if channel == 1 else self.channel2var_dial
+    if channel in _analog_channels(self):
+        dial = getattr(self, f"channel{channel}var_dial")
         scale = available_scales[dial.value()]
         self.scale_label.setText(f"Scale: {scale} V/")
         return scale
@@ -65,8 +73,8 @@ def get_current_scale(self: "Oscilloscope", channel: int) -> Decimal:  # type: i
 
 
 def set_current_scale(self: "Oscilloscope", channel: int, scale: Decimal) -> None:  # type: ignore # noqa: F821
-    if channel in [1, 2]:
-        dial: QtWidgets.QDial = self.channel1var_dial if channel == 1 else self.channel2var_dial
+    if channel in _analog_channels(self):
+        dial: QtWidgets.QDial = getattr(self, f"channel{channel}var_dial")
         scale_int = available_scales.index(scale)
         dial.setValue(scale_int)
         self.scale_label.setText(f"Scale: {scale} V/")
@@ -77,8 +85,8 @@ def set_current_scale(self: "Oscilloscope", channel: int, scale: Decimal) -> Non
 def get_current_offset(self: "Oscilloscope", channel: int) -> Decimal:  # type: ignore # noqa: F821
     """Get current offset in data coordinates. Dials use integers and DIAL_PREC_FACT
     is always integer. Dividing these integers as Decimals keeps precision."""
-    if channel in [1, 2]:
-        pos_dial: QtWidgets.QDial = self.channel1pos_dial if channel == 1 else self.channel2pos_dial
+    if channel in _analog_channels(self):
+        pos_dial: QtWidgets.QDial = getattr(self, f"channel{channel}pos_dial")
         # Interpret dial value as offset after reducing by precision factor
         offset_data = Decimal(pos_dial.value()) / Decimal(DIAL_PREC_FACT)
         return Decimal(offset_data)
@@ -90,8 +98,8 @@ def get_current_offset(self: "Oscilloscope", channel: int) -> Decimal:  # type:
 
 
 def set_current_offset(self: "Oscilloscope", channel: int, offset_data: Decimal):  # type: ignore # noqa: F821
-    if channel in [1, 2]:
-        pos_dial: QtWidgets.QDial = self.channel1pos_dial if channel == 1 else self.channel2pos_dial
+    if channel in _analog_channels(self):
+        pos_dial: QtWidgets.QDial = getattr(self, f"channel{channel}pos_dial")
         offset_decimal = Decimal(offset_data) * Decimal(DIAL_PREC_FACT)
         if offset_decimal == int(offset_decimal):
             pos_dial.setValue(int(offset_decimal))
@@ -110,13 +118,9 @@ def relim_and_update_chart(self, scale, offset_data: Decimal, channel: int):
         # First update axis limits so to properly calculate the indicator's position in axes coordinates
         self.canvas.update_chart(ylim=new_ylims, axis_number=channel)
 
-        if channel in [1, 2]:
-            indicator: VerticalOffsetIndicator = (
-                self.canvas.channel1_offset_indicator
-                if channel == 1
-                else self.canvas.channel2_offset_indicator
-            )
-            state = self.channel1.Enabled if channel == 1 else self.channel2.Enabled
+        if channel in _analog_channels(self):
+            indicator: VerticalOffsetIndicator = getattr(self.canvas, f"channel{channel}_offset_indicator")
+            state = getattr(self, f"channel{channel}").Enabled
             # Use updated axis limits to change the offset_data to new axes coordinates
             offset = self.canvas.data_to_axes(float(offset_data), "y", axis_number=channel)
 
@@ -169,7 +173,7 @@ def adjust_vertical_scale(self, channel):
     accordingly during the adjustment. The adjustable range of the vertical scale is related to 
     the probe ratio currently set. By default, the probe attenuation factor is 1X and the 
     adjustable range of the vertical scale is from 500uV/div to 10 V/div."""
-    if channel in [1, 2]:
+    if channel in _analog_channels(self):
         scale = getattr(self, f"channel{channel}").Vdiv = get_current_scale(self, channel)
         offset_data = getattr(self, f"channel{channel}").Offset
         pos_dial = getattr(self, f"channel{channel}pos_dial")
@@ -195,7 +199,7 @@ def adjust_vertical_position(self, channel):
     | 1.02 V/div - 10 V/div   | ±200 V                     |
 
     """
-    if channel in [1, 2]:
+    if channel in _analog_channels(self):
         offset_data = getattr(self, f"channel{channel}").Offset = get_current_offset(self, channel)
         scale = getattr(self, f"channel{channel}").Vdiv
         relim_and_update_chart(self, scale, offset_data, channel)
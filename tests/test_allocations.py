@@ -0,0 +1,73 @@
+"""Steady-state frames must not allocate anything proportional to the memory depth."""
+
+from decimal import Decimal
+
+import numpy as np
+import pytest
+
+from packages.memory_alloc import assert_steady_state_allocations
+from signal_generator import planner, signals
+from signal_generator.dds import dds_waveforms
+from signal_generator.streaming import BLOCK_SIZE, StreamingSynthesizer, streamable_waveforms
+
+MEM_DEPTH = 1_400_000
+TIMEBASE = Decimal("1E-4")  # 1 GSa/s, 1 Mpts
+FREQ = 50e6
+
+# Costs [s] under which the planner places the pulses in memory (loop or scatter): the
+# convolutions keep full-size buffers, the choice must not depend on the timings of the machine
+PLACEMENT_COSTS = {
+    "per_call": 1e-6,
+    "per_slice_sample": 1e-9,
+    "per_fancy_sample": 1e-9,
+    "per_fft_sample": 1.0,
+    "per_oa_sample": 1.0,
+    "per_copy_sample": 1e-9,
+    "per_fill_sample": 1e-9,
+    "per_impulse": 1e-9,
+}
+
+# The FFT convolution keeps its own buffers
+cases = [
+    (waveform, dds)
+    for waveform in signals.available_waveforms[:-1]
+    for dds in ([False, True] if waveform in dds_waveforms else [False])
+]
+
+
+@pytest.fixture(autouse=True)
+def fixed_planner(monkeypatch, tmp_path):
+    """Planner of fixed costs, with its cost cache (if any) in a temporary directory."""
+    fixed = planner.PulseTrainPlanner(str(tmp_path / "pulse_train_costs.json"), coefficients=PLACEMENT_COSTS)
+    monkeypatch.setattr(planner, "_planner", fixed)
+    return fixed
+
+
+@pytest.fixture
+def buffers(monkeypatch):
+    monkeypatch.setattr(signals, "mem_depth", MEM_DEPTH)
+    return {name: np.empty(MEM_DEPTH, dtype=signals._dtype) for name in ("out_wfm", "out_noise")}
+
+
+@pytest.mark.parametrize("waveform, dds", cases)
+def test_get_waveform(buffers, waveform, dds):
+    assert_steady_state_allocations(
+        signals.get_waveform, buffers["out_wfm"].nbytes // 20, waveform=waveform, connector_state=True, freq=FREQ,
+        phase=0, timebase=TIMEBASE, noise_std_dev=.01, active_channels=1, pulse_width=1E-9,
+        repetition_rate=8.8E6,  # the scatter temporaries scale with the number of pulses
+        dds=dds, **buffers,
+    )
+
+
+@pytest.mark.parametrize(
+    "waveform, dds",
+    [(waveform, dds) for waveform in streamable_waveforms for dds in ([False, True] if waveform in dds_waveforms else [False])],
+)
+def test_streaming_synthesizer(buffers, waveform, dds):
+    """The temporaries of a stream are bounded by its blocks (the evaluated shapes take a
+    few float64 blocks), not by the memory depth."""
+    synthesizer = StreamingSynthesizer(waveform, freq=FREQ, noise_std_dev=.01, repetition_rate=8.8E6, dds=dds)
+    t = signals._generate_time_axis(TIMEBASE, 1)
+    limit = 4 * BLOCK_SIZE * np.dtype(np.float64).itemsize
+    assert limit < buffers["out_wfm"][: len(t)].nbytes
+    assert_steady_state_allocations(synthesizer.acquire, limit, buffers["out_wfm"][: len(t)], t.t0, t.dt)
@@ -0,0 +1,28 @@
+"""Frames of `get_waveform` into caller-provided buffers."""
+
+from decimal import Decimal
+
+import numpy as np
+
+from signal_generator import signals
+
+
+def test_unplugged_connector_cuts_full_depth_buffers(monkeypatch):
+    """An unplugged connector returns the noise alone, in the leading part of buffers sized
+    for the full memory depth when the timebase acquires fewer points."""
+    mem_depth = 14_000_000
+    monkeypatch.setattr(signals, "mem_depth", mem_depth)
+    out_wfm = np.full(mem_depth, np.nan, dtype=signals._dtype)
+    out_noise = np.empty(mem_depth, dtype=signals._dtype)
+
+    t, wfm, noise = signals.get_waveform(
+        waveform="sine", connector_state=False, timebase=Decimal("1E-6"), noise_std_dev=.01, active_channels=1,
+        out_wfm=out_wfm, out_noise=out_noise,
+    )
+
+    assert len(t) < mem_depth
+    assert len(wfm) == len(noise) == len(t)
+    assert np.shares_memory(wfm, out_wfm) and np.shares_memory(noise, out_noise)
+    np.testing.assert_array_equal(wfm, noise)
+    assert noise.std() > 0
+    assert np.isnan(out_wfm[len(t):]).all()  # the rest of the memory is untouched